@@ -1,33 +1,211 @@
-from fastapi import FastAPI, HTTPException
-from src.core.agent import CodiAgent, CodingTask, CodeResponse
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import logging
+import os
+import queue
+import orjson
+import uvicorn
+from pydantic import TypeAdapter, ValidationError
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from src.core.agent import STREAMABLE_TASK_TYPES, CodiAgent, CodingTask, CodeResponse, create_http_client, load_env
+from src.core.batcher import TaskBatcher
+from src.core.cache import ResponseCache, SingleFlight, create_redis, make_key
+from src.core.semantic_cache import SemanticCache
+
+logger = logging.getLogger("codi.api")
+logging.getLogger("codi").setLevel(logging.WARNING)
+
+# Shared state, populated once per worker at startup
+app_state = {}
+
+# Error bodies are built once; details go to the log, not the client.
+# Responses are returned rather than a shared exception re-raised, which would keep
+# every failure's traceback alive.
+_500_BODY = orjson.dumps({"detail": "internal_error"})
+
+@lru_cache(maxsize=32)
+def _not_implemented_body(task_type: str) -> bytes:
+    return orjson.dumps({"detail": f"Task type '{task_type}' not implemented yet"})
+
+# Built once so /task validates raw request bytes without a json.loads pass
+TASK_ADAPTER = TypeAdapter(CodingTask)
+
+# How long cached task responses stay in Redis, per task type (seconds)
+TASK_CACHE_TTLS = {
+    "review": 3600,
+    "analyze": 6 * 3600,
+    "generate": 24 * 3600
+}
+
+# Exact-match cache for repeated tasks; backed by Redis when REDIS_URL is set
+task_cache = ResponseCache(
+    maxsize=1024,
+    encode=lambda response: orjson.dumps(response.model_dump()),
+    decode=lambda raw: CodeResponse.model_validate(orjson.loads(raw))
+)
+
+# Similarity cache for rephrased tasks, persisted across restarts
+semantic_cache = SemanticCache(index_path=".codi/cache/tasks.faiss")
+
+# Identical concurrent tasks share one agent call, and agent calls are capped
+inflight_tasks = SingleFlight()
+MAX_CONCURRENT_TASKS = 16
+task_limiter = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the AI agent and caches when the worker starts"""
+    # Hand log records to a background thread so logging never blocks the event loop
+    log_queue = queue.SimpleQueue()
+    log_handler = QueueHandler(log_queue)
+    log_listener = QueueListener(log_queue, logging.StreamHandler())
+    logging.getLogger("codi").addHandler(log_handler)
+    log_listener.start()
+    
+    app_state["http"] = create_http_client()
+    app_state["agent"] = CodiAgent(http_client=app_state["http"])
+    await app_state["agent"].warmup()
+    app_state["batcher"] = TaskBatcher(app_state["agent"])
+    app_state["batcher"].start()
+    task_cache.redis = create_redis()
+    semantic_cache.load()
+    yield
+    await app_state["batcher"].stop()
+    await app_state["agent"].aclose()
+    semantic_cache.save()
+    if task_cache.redis is not None:
+        await task_cache.redis.aclose()
+        task_cache.redis = None
+    await app_state["http"].aclose()
+    app_state.clear()
+    log_listener.stop()
+    logging.getLogger("codi").removeHandler(log_handler)
+
+# Liveness probes hit this constantly, so it skips serialization and dependencies.
+# It stays async: a plain def would be dispatched to the threadpool instead.
+health_router = APIRouter()
+_HEALTH_BODY = b'{"status":"healthy"}'
+
+@health_router.get("/health", response_class=Response)
+async def health_check():
+    """Health check endpoint"""
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 app = FastAPI(
     title="Codi - AI Coding Agent",
     description="An AI agent designed to code at the level of a senior software engineer",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
+app.include_router(health_router)
 
-# Initialize the AI agent
-agent = CodiAgent()
-
-@app.post("/task", response_model=CodeResponse)
-async def process_task(task: CodingTask):
+@app.post(
+    "/task",
+    response_model=CodeResponse,
+    response_class=ORJSONResponse,
+    # The body is parsed by hand, so document it here; /task/stream registers the schema
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/CodingTask"}}}
+        }
+    }
+)
+async def process_task(request: Request):
     """Process a coding task and return the AI's response"""
     try:
-        response = await agent.process_task(task)
-        return response
+        task = TASK_ADAPTER.validate_json(await request.body(), strict=True)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    
+    batcher = app_state["batcher"]
+    try:
+        key = make_key(task.model_dump())
+        if (cached := await task_cache.get(key)) is not None:
+            return ORJSONResponse(content=cached.model_dump())
+        
+        # Tasks only match semantically when they carry the same code context
+        scope = make_key([task.task_type, task.context.model_dump(), task.requirements])
+        embedding, similar = await semantic_cache.lookup(task.description, scope=scope)
+        if similar is not None:
+            return ORJSONResponse(content=similar)
+        
+        async def run_task() -> CodeResponse:
+            async with task_limiter:
+                response = await batcher.submit(task)
+            # Failed tasks come back as error responses; don't cache those
+            if response.explanation != "An error occurred":
+                await task_cache.set(key, response, ttl=TASK_CACHE_TTLS.get(task.task_type))
+                await semantic_cache.insert(embedding, response.model_dump(), scope=scope)
+            return response
+        
+        response = await inflight_tasks.do(key, run_task)
+        return ORJSONResponse(content=response.model_dump())
     except NotImplementedError:
-        raise HTTPException(
-            status_code=501,
-            detail=f"Task type '{task.task_type}' not implemented yet"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=str(e)
-        )
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"} 
\ No newline at end of file
+        return Response(content=_not_implemented_body(task.task_type), status_code=501, media_type="application/json")
+    except Exception:
+        logger.exception("task failed", extra={"task_type": task.task_type})
+        return Response(content=_500_BODY, status_code=500, media_type="application/json")
+
+@app.post("/task/stream")
+async def stream_task(task: CodingTask):
+    """Stream the AI's progress events and response to a task as server-sent events"""
+    if task.task_type not in STREAMABLE_TASK_TYPES:
+        return Response(content=_not_implemented_body(task.task_type), status_code=501, media_type="application/json")
+    
+    # Each request streams on its own; nothing is shared through the agent's chat memory
+    agent = app_state["agent"]
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        try:
+            async for chunk in agent.stream_task(
+                task,
+                on_event=lambda event: queue.put_nowait(b"event: progress\ndata: " + orjson.dumps(event) + b"\n\n")
+            ):
+                queue.put_nowait(b"data: " + orjson.dumps(chunk) + b"\n\n")
+        except Exception:
+            logger.exception("task stream failed", extra={"task_type": task.task_type})
+            queue.put_nowait(b"event: error\ndata: " + _500_BODY + b"\n\n")
+        finally:
+            queue.put_nowait(None)
+    
+    async def events():
+        producer = asyncio.create_task(produce())
+        try:
+            while (frame := await queue.get()) is not None:
+                yield frame
+            yield b"event: done\ndata: {}\n\n"
+        finally:
+            producer.cancel()
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/metrics")
+async def metrics():
+    """Cache hit/miss counters"""
+    return {
+        "task_cache": task_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "inflight_tasks": len(inflight_tasks)
+    }
+
+if __name__ == "__main__":
+    load_env()
+    
+    # One worker per core, each with its own agent created in the lifespan handler
+    uvicorn.run(
+        "api.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
\ No newline at end of file
@@ -4,23 +4,40 @@ setup(
     name="codi",
     version="0.1.0",
     packages=find_packages(),
+    package_data={"src.integrations": ["mvp_template/**/*"]},
+    python_requires=">=3.11",
     install_requires=[
         "openai>=1.0.0",
         "python-dotenv==1.0.0",
         "fastapi>=0.109.0",
-        "uvicorn>=0.27.0",
+        "uvicorn[standard]>=0.27.0",
         "pydantic>=2.6.0",
+        "orjson>=3.9.0",
+        "msgspec>=0.18.0",
         "python-multipart>=0.0.9",
-        "httpx>=0.26.0",
+        "httpx[http2]>=0.26.0",
+        "tiktoken>=0.7.0",
         "pytest>=8.0.0",
         "black>=24.1.0",
         "isort>=5.13.0",
         "mypy>=1.8.0",
         "ruff>=0.2.0",
         "click>=8.0.0",
+        "prompt_toolkit>=3.0.0",
+        "rich>=13.0.0",
         "slack-bolt>=1.18.0",
-        "PyGithub>=2.1.1"
+        "PyGithub>=2.1.1",
+        "pybase64>=1.3.0",
+        "redis>=5.0.1",
+        "uvloop>=0.19.0; sys_platform != 'win32'"
     ],
+    extras_require={
+        "semantic": [
+            "faiss-cpu>=1.7.4",
+            "sentence-transformers>=2.2.0",
+            "filelock>=3.12.0"
+        ]
+    },
     entry_points={
         'console_scripts': [
             'codi=src.cli:cli',
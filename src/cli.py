@@ -3,9 +3,19 @@ import click
 import asyncio
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .core.agent import CodiAgent
-from .integrations.slack_bot import start_async_slack_bot
+# Heavy dependencies (LLM client, Slack SDK, prompt/terminal UI) are imported
+# where they are used, so `codi --help` stays fast
+if TYPE_CHECKING:
+    from .core.agent import CodiAgent
+
+# Prefer uvloop's libuv-based event loop when it is installed
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    run_async = asyncio.run
 
 @click.group()
 def cli():
@@ -16,9 +26,6 @@ def cli():
 def run():
     """Start Codi in interactive mode (CLI + Slack)"""
     try:
-        # Initialize the agent
-        agent = CodiAgent()
-        
         # Print welcome message
         click.echo(click.style("\n🚀 Starting Codi...", fg="green", bold=True))
         click.echo(click.style("Your AI Senior Software Developer", fg="green"))
@@ -28,27 +35,57 @@ def run():
         click.echo("2. Slack Integration")
         
         # Start both CLI and Slack interfaces
-        asyncio.run(start_services(agent))
+        run_async(start_services())
         
     except Exception as e:
         click.echo(click.style(f"\nError: {str(e)}", fg="red"), err=True)
 
-async def start_services(agent: CodiAgent):
+async def start_services():
     """Start both CLI and Slack services"""
+    from .core.agent import CodiAgent, create_http_client
+    from .integrations.slack_bot import start_async_slack_bot
+    
     try:
-        # Create tasks for both services
-        cli_task = asyncio.create_task(interactive_chat(agent))
-        slack_task = asyncio.create_task(start_async_slack_bot(agent))
-        
-        # Wait for both tasks
-        await asyncio.gather(cli_task, slack_task)
+        # Share one pooled HTTP client for every LLM call
+        async with create_http_client() as http_client:
+            agent = CodiAgent(http_client=http_client)
+            
+            # Run both services; if one fails the other is cancelled
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(interactive_chat(agent))
+                    tg.create_task(start_async_slack_bot(agent))
+            finally:
+                await agent.aclose()
     except KeyboardInterrupt:
         click.echo("\n\nShutting down Codi... 👋")
-    except Exception as e:
-        click.echo(f"\nError: {str(e)}", err=True)
+    except ExceptionGroup as eg:
+        for e in eg.exceptions:
+            click.echo(f"\nError: {str(e)}", err=True)
+
+# Styled strings reused on every chat turn
+_CODI_HEADER = click.style("\nCodi", fg="green", bold=True)
+_ERR_PREFIX = click.style("\nError: ", fg="red")
 
-async def interactive_chat(agent: CodiAgent):
+# Spinner status text for the agent's progress events
+EVENT_LABELS = {
+    "llm:generating": "Thinking...",
+    "tool:file_scan": "Scanning files...",
+    "task:analyze": "Analyzing code...",
+    "task:generate": "Generating code...",
+    "task:review": "Reviewing code..."
+}
+
+async def interactive_chat(agent: "CodiAgent"):
     """Run the interactive chat loop"""
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+    from rich.live import Live
+    from rich.spinner import Spinner
+    from .core.agent import ErrorReply
+    from .core.cache import ResponseCache, make_key, normalize_text
+    from .core.semantic_cache import SemanticCache
+    
     click.echo(click.style("\n✨ CLI Chat Interface Ready!", fg="green"))
     click.echo(click.style("\nTips:", fg="yellow"))
     click.echo("• Chat with me as you would with a senior software developer")
@@ -56,28 +93,62 @@ async def interactive_chat(agent: CodiAgent):
     click.echo("• Use Ctrl+C to exit")
     click.echo("• Your conversation is synced with Slack")
     
-    while True:
-        try:
-            # Get user input
-            user_input = click.prompt("\nYou", prompt_suffix=" > ", type=str)
-            
-            # Process the message
-            with click.progressbar(
-                length=1,
-                label=click.style("Thinking...", fg="blue"),
-                show_eta=False
-            ) as pb:
-                response = await agent.chat(user_input)
-                pb.update(1)
-            
-            # Print the response
-            click.echo(click.style("\nCodi", fg="green", bold=True))
-            click.echo(response)
-            
-        except click.exceptions.Abort:
-            raise KeyboardInterrupt
-        except Exception as e:
-            click.echo(click.style(f"\nError: {str(e)}", fg="red"), err=True)
+    chat_cache = ResponseCache(maxsize=1024)
+    semantic_cache = SemanticCache()
+    session = PromptSession()
+    
+    # Keep log lines printed while the prompt is up from breaking it; raw lets colours and the spinner through
+    with patch_stdout(raw=True):
+        while True:
+            try:
+                # Get user input without blocking the event loop
+                user_input = await session.prompt_async("\nYou > ")
+                if not user_input.strip():
+                    continue
+                
+                # Reuse the previous answer for repeated input in this conversation
+                conversation_id = agent.chat_memory.current_conversation.id
+                key = make_key([conversation_id, normalize_text(user_input)])
+                response = await chat_cache.get(key)
+                embedding = None
+                if response is None:
+                    embedding, response = await semantic_cache.lookup(user_input, scope=conversation_id)
+                
+                # Print the response
+                click.echo(_CODI_HEADER)
+                if response is not None:
+                    click.echo(response)
+                    continue
+                
+                # Stream the response, showing a spinner whenever the agent is working
+                status = Spinner("dots", text=EVENT_LABELS["llm:generating"], style="blue")
+                chunks = []
+                with Live(status, transient=True) as live:
+                    def on_event(event: str):
+                        status.update(text=EVENT_LABELS.get(event, event))
+                        if not live.is_started:
+                            # The spinner redraws its own line, so don't start it on a line the reply is using
+                            if chunks and not chunks[-1].endswith("\n"):
+                                click.echo()
+                            live.start()
+                    
+                    async for chunk in agent.chat_stream(user_input, on_event=on_event):
+                        live.stop()
+                        chunks.append(chunk)
+                        click.echo(chunk, nl=False)
+                click.echo()
+                
+                # A failed turn ends with an error reply; leave it out so a retry reaches the agent
+                if chunks and isinstance(chunks[-1], ErrorReply):
+                    continue
+                response = "".join(chunks)
+                await chat_cache.set(key, response)
+                await semantic_cache.insert(embedding, response, scope=conversation_id)
+                
+            except EOFError:
+                raise KeyboardInterrupt
+            except Exception as e:
+                click.echo(f"{_ERR_PREFIX}{e}", err=True)
 
 if __name__ == '__main__':
     cli() 
\ No newline at end of file
@@ -1,23 +1,209 @@
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Union
+import io
 import os
+import httpx
 from openai import AsyncOpenAI
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
-import json
+import orjson
 from .chat import ChatMemory, Message
 from .workflow_logger import WorkflowLogger, log_workflow
+from .cache import ResponseCache, create_redis, make_key
+from .workspace import FileCache, LazyFileMap, scan_stats
+from .semantic_cache import get_encoder, semantic_cache_available
 import time
 import asyncio
+import logging
+import re
+from contextvars import ContextVar
+from functools import lru_cache
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Set inside a coding task started from chat, so its workflow logging goes to its own logger
+_task_logger: ContextVar[Optional[WorkflowLogger]] = ContextVar("task_logger", default=None)
+
+@lru_cache(maxsize=1)
+def load_env():
+    """Load environment variables from .env, once per process"""
+    load_dotenv()
+
+@lru_cache(maxsize=1)
+def _github_repo() -> Optional[str]:
+    return os.getenv("GITHUB_REPO")
 
 # Global configuration
 OPENAI_MODEL = "gpt-4o"  # Easy to change model version in one place
+GREETINGS = {'hi', 'hello', 'test'}  # Answered without calling the model
+BATCH_POLL_INTERVAL = 30  # Seconds between Batch API status checks
+BATCH_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+CHAT_TOKEN_BUDGET = 6000  # Prompt tokens allowed for a chat turn, including history
+STREAMABLE_TASK_TYPES = frozenset({"analyze", "generate", "review"})  # Task types stream_task handles
+
+# Keyword tables for routing chat messages, matched against the message's words
+_WORD_RE = re.compile(r"[a-z]+")
+_ANALYZE_KW = frozenset({
+    "analyze", "analyzes", "analyzed", "analyzing",
+    "review", "reviews", "reviewed", "reviewing",
+    "check", "checks", "checked", "checking"
+})
+_GENERATE_KW = frozenset({
+    "generate", "generates", "generated", "generating",
+    "create", "creates", "created", "creating",
+    "write", "writes", "writing",
+    "implement", "implements", "implemented", "implementing", "implementation"
+})
+_FILE_KW = frozenset({
+    "file", "files", "directory", "directories", "folder", "folders",
+    "repo", "repos", "repository", "repositories", "count", "counts", "counting"
+})
+_REVIEW_PHRASES = ("review pr", "review pull request", "check pr")
+
+# A "File: path" or "filename: path" header line, or a fenced code block (an unclosed last one runs to the end)
+_BLOCK_RE = re.compile(
+    r"^(?:File|filename):[ \t]*(?P<header>\S+)[ \t]*\r?$"
+    r"|^```(?P<info>[^\r\n]*)(?:\r?\n(?P<body>.*?))??(?:\r?\n```[ \t]*\r?$|\s*\Z)",
+    re.MULTILINE | re.DOTALL
+)
+
+# A whole line mentioning a suggestion keyword
+_SUGG_RE = re.compile(r"^[^\n]*(?:suggest|recommend|consider|should|could)[^\n]*$", re.IGNORECASE | re.MULTILINE)
+
+def _tokenize(message: str) -> frozenset:
+    """Split a message into its lowercase words"""
+    return frozenset(_WORD_RE.findall(message.lower()))
+
+# System prompts are kept byte-identical across calls, with all task-specific
+# content placed after them, so the provider's prompt-prefix cache can be reused
+_ANALYSIS_SYSTEM_PROMPT = """You are a senior software developer performing code analysis. Be thorough but concise.
+
+Focus on:
+1. Code structure and organization
+2. Potential bugs or issues
+3. Performance considerations
+4. Best practices and patterns
+5. Security concerns
+6. Suggestions for improvement"""
+
+_BATCH_ANALYSIS_INSTRUCTIONS = """You will receive several independent analysis tasks, each numbered.
+Analyze every task separately and respond with a JSON object of the form
+{"results": [{"index": <task number>, "analysis": "<markdown analysis>"}, ...]}
+containing exactly one result per task."""
+
+_GENERATION_SYSTEM_PROMPT = """You are a senior software developer generating production-ready code. Focus on writing clean, efficient, and well-documented code that follows best practices.
+
+Please ensure the code:
+1. Follows best practices and design patterns
+2. Is well-documented and maintainable
+3. Handles edge cases and errors appropriately
+4. Is efficient and performant
+5. Includes necessary imports and dependencies
+6. Is security-conscious
+
+Generate complete, production-ready code that can be used immediately."""
+
+_REVIEW_SYSTEM_PROMPT = """You are a senior software developer performing a thorough code review. Be specific, constructive, and provide actionable feedback with examples.
+
+Please analyze the code for:
+1. Code Quality:
+   - Clean code principles
+   - Design patterns usage
+   - Code organization
+   - Naming conventions
+   - Documentation quality
+
+2. Functionality:
+   - Logic correctness
+   - Edge cases handling
+   - Error handling
+   - API consistency
+
+3. Performance:
+   - Algorithmic efficiency
+   - Resource usage
+   - Potential bottlenecks
+   - Optimization opportunities
+
+4. Security:
+   - Potential vulnerabilities
+   - Input validation
+   - Authentication/Authorization issues
+   - Data protection
+
+5. Maintainability:
+   - Code complexity
+   - Test coverage
+   - Dependencies
+   - Technical debt
+
+6. Best Practices:
+   - Language-specific conventions
+   - Framework usage
+   - Modern practices
+   - Industry standards
+
+Provide specific, actionable feedback with code examples where relevant."""
+
+# Structured output for reviews, so one call returns both the review and the improvements
+_REVIEW_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "code_review",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "review": {"type": "string", "description": "The general code review, in markdown"},
+                "improvements": {
+                    "type": "string",
+                    "description": "Specific code improvements and refactoring suggestions, in markdown, "
+                                   "with code examples for the most important changes"
+                },
+                "suggestions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Short, actionable suggestions from the review"
+                }
+            },
+            "required": ["review", "improvements", "suggestions"],
+            "additionalProperties": False
+        }
+    }
+}
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """Load the tokenizer for the chat model once per process, or None if it can't be loaded"""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(OPENAI_MODEL)
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, estimating token counts: {e!r}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in text, estimating ~4 characters per token without a tokenizer"""
+    if (tokenizer := get_tokenizer()) is None:
+        return len(text) // 4 + 1
+    return len(tokenizer.encode_ordinary(text))
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client to share across LLM calls"""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200)
+    )
+
+class ErrorReply(str):
+    """A chat reply reporting a failure; callers shouldn't cache it like a real answer"""
 
 class CodeContext(BaseModel):
     """Represents the current coding context"""
-    files: Dict[str, str]  # file paths and their contents
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    # File paths and their contents; the lazy map is checked first so it isn't copied into a dict
+    files: Union[LazyFileMap, Dict[str, str]] = Field(union_mode="left_to_right")
     current_file: Optional[str] = None
     language: Optional[str] = None
     project_root: Optional[str] = None
@@ -39,12 +225,23 @@ class CodeResponse(BaseModel):
 class CodiAgent:
     """Main AI agent class for code understanding and generation"""
     
-    def __init__(self):
-        """Initialize the AI agent with necessary components"""
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None, batch_mode: bool = False):
+        """Initialize the AI agent with necessary components
+        
+        Args:
+            http_client: Shared HTTP client for LLM calls; a pooled one is created if omitted
+            batch_mode: Send generate/review calls through the Batch API (cheaper, but not interactive)
+        """
+        load_env()
         self.current_context: Optional[CodeContext] = None
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.batch_mode = batch_mode
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client()
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=self.http_client)
         self.chat_memory = ChatMemory()
-        self.workflow_logger = WorkflowLogger()
+        self._workflow_logger = WorkflowLogger()
+        self._response_cache = ResponseCache(maxsize=256, redis=create_redis(), prefix="codi:llm:")
+        self._file_cache = FileCache()  # Workspace file contents, reused across tasks
         self.personality = {
             "name": "Codi",
             "role": "AI Senior Software Developer",
@@ -67,11 +264,28 @@ class CodiAgent:
                 "workspace_path": self.workspace_path,
                 "project_name": self.project_name
             })
+        
+        # The personality never changes after init, so build its prompt once
+        self._personality_prompt = self._get_personality_prompt()
+    
+    async def aclose(self):
+        """Close the agent's connections"""
+        if self._response_cache.redis is not None:
+            await self._response_cache.redis.aclose()
+            self._response_cache.redis = None
+        if self._owns_http_client:
+            await self.http_client.aclose()
+    
+    async def warmup(self):
+        """Preload heavy resources so the first request doesn't pay for them"""
+        await asyncio.to_thread(get_tokenizer)
+        if semantic_cache_available():
+            await asyncio.to_thread(get_encoder)
     
     def _detect_workspace(self) -> Optional[str]:
         """Detect the workspace path from environment variables and git"""
         # Try to get from GITHUB_REPO env var
-        if github_repo := os.getenv("GITHUB_REPO"):
+        if github_repo := _github_repo():
             # Extract repo name from github repo string
             repo_name = github_repo.split('/')[-1] if '/' in github_repo else github_repo
             # Look for this directory in common locations
@@ -102,144 +316,281 @@ class CodiAgent:
         # If all else fails, use current directory
         return os.getcwd()
     
-    async def chat(self, message: str, source: str = "cli") -> str:
-        """Handle a chat message from the user"""
+    @property
+    def workflow_logger(self) -> WorkflowLogger:
+        """The logger for the current flow; a coding task started from chat has its own"""
+        task_logger = _task_logger.get()
+        return task_logger if task_logger is not None else self._workflow_logger
+    
+    async def chat(self, message: str, source: str = "cli", session_id: Optional[str] = None) -> str:
+        """Handle a chat message from the user; failures come back as an ErrorReply"""
+        parts = [part async for part in self.chat_stream(message, source, session_id=session_id)]
+        reply = "".join(parts)
+        return ErrorReply(reply) if parts and isinstance(parts[-1], ErrorReply) else reply
+    
+    async def chat_stream(
+        self,
+        message: str,
+        source: str = "cli",
+        on_event: Optional[Callable[[str], None]] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Handle a chat message from the user, yielding the response as it is generated.
+        A failure is reported as a final ErrorReply chunk.
+        
+        Args:
+            message: The user's message
+            source: Where the message came from ('cli', 'slack', 'api')
+            on_event: Optional callback for progress events such as
+                'llm:generating', 'task:analyze' or 'tool:file_scan'
+            session_id: Identifies the chat session (e.g. a Slack thread) so its
+                requests share the provider's prompt cache; defaults to the conversation
+        """
+        emit = on_event or (lambda event: None)
         try:
-            # Reset workflow logger for new conversation
-            self.workflow_logger.reset()
-            self.workflow_logger.log_step("Starting new conversation", details=f"Message: {message[:100]}...")
-            
-            # Start or continue conversation
-            if not self.chat_memory.current_conversation:
-                self.workflow_logger.log_step("Initializing conversation context")
-                self.chat_memory.start_conversation(self.workspace_path)
-            
-            # Add user message to memory with source
-            self.chat_memory.add_message("user", message, metadata={"source": source})
-            
-            # Get conversation context
-            self.workflow_logger.log_step("Preparing conversation context")
-            context = self.chat_memory.get_conversation_context()
-            recent_messages = self.chat_memory.get_recent_messages()
-            
-            # Prepare the conversation for the AI
-            self.workflow_logger.log_step("Building conversation history")
-            messages = [
-                {
-                    "role": "system",
-                    "content": self._get_personality_prompt()
-                }
-            ]
+            messages = self._prepare_chat(message, source)
+            session_id = session_id or self.chat_memory.current_conversation.id
+            
+            # Start any requested coding task now, so it runs alongside the conversational reply.
+            # Its log lines are held back so they don't land in the middle of the streamed reply.
+            words = _tokenize(message)
+            task_type = self._identify_task_type(message, words)
+            task_logger = WorkflowLogger(buffered=True)
+            task_run = asyncio.create_task(self._run_chat_task(message, task_type, task_logger)) if task_type else None
+            
+            try:
+                # Stream the response from OpenAI
+                emit("llm:generating")
+                self.workflow_logger.log_step("Thinking about response", "GPT-4", "Streaming response")
+                start_time = time.time()
+                parts = []
+                async for delta in self._stream_completion(messages, start_time, session_id):
+                    parts.append(delta)
+                    yield delta
+                
+                # Store the full response
+                assistant_message = "".join(parts)
+                self.chat_memory.add_message("assistant", assistant_message, metadata={"source": source})
+                
+                if follow_up := await self._chat_follow_up(message, words, task_type, task_run, task_logger, start_time, emit):
+                    follow_up_chunk = f"\n\n{follow_up}"
+                    yield ErrorReply(follow_up_chunk) if isinstance(follow_up, ErrorReply) else follow_up_chunk
+            finally:
+                if task_run is not None and not task_run.done():
+                    task_run.cancel()
             
-            # Add project context
-            if self.workspace_path:
-                messages.append({
-                    "role": "system",
-                    "content": f"""You are actively working in the project '{self.project_name}' located at {self.workspace_path}.
+        except Exception as e:
+            yield self._chat_error(e, source)
+    
+    async def stream_task(
+        self,
+        task: CodingTask,
+        on_event: Optional[Callable[[str], None]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the answer to a coding task without touching the chat history
+        
+        Args:
+            task: The task; its type picks the prompt, and its context and requirements fill it
+            on_event: Optional callback for progress events such as 'task:review' or 'llm:generating'
+        """
+        if task.task_type not in STREAMABLE_TASK_TYPES:
+            raise NotImplementedError(f"Task type '{task.task_type}' can't be streamed")
+        emit = on_event or (lambda event: None)
+        emit(f"task:{task.task_type}")
+        
+        # Read only the workspace files this task needs
+        if isinstance(task.context.files, LazyFileMap):
+            task = await self._resolve_files(task)
+        
+        if task.task_type == "analyze":
+            messages = self._build_messages(_ANALYSIS_SYSTEM_PROMPT, self._prepare_analysis_prompt(task))
+        elif task.task_type == "generate":
+            messages = self._build_messages(_GENERATION_SYSTEM_PROMPT, self._prepare_generation_prompt(task))
+        else:
+            messages = self._build_messages(_REVIEW_SYSTEM_PROMPT, self._prepare_review_prompt(task))
+        
+        emit("llm:generating")
+        self.workflow_logger.log_step(f"Streaming {task.task_type} task", "GPT-4")
+        async for delta in self._stream_completion(messages, time.time(), temperature=0.2):
+            yield delta
+        self.workflow_logger.log_result(True, f"Streamed {task.task_type} task")
+    
+    async def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        start_time: float,
+        session_id: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion, replaying it from the response cache for an identical conversation"""
+        key = make_key([OPENAI_MODEL, temperature, messages])
+        if (cached := await self._response_cache.get(key)) is not None:
+            yield cached
+            return
+        
+        stream = await self.client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            # Requests with the same key are routed to the same prompt cache, so the
+            # shared history prefix isn't prefilled again on every turn
+            extra_body={"prompt_cache_key": session_id} if session_id else None
+        )
+        
+        parts = []
+        chunks = aiter(stream)
+        while True:
+            # Show progress while waiting for the first token; after that the reply itself
+            # is on stdout and a progress line would land in the middle of it
+            if parts:
+                chunk = await anext(chunks, None)
+            else:
+                chunk = await self._wait_for_chunk(chunks, start_time)
+            if chunk is None:
+                break
+            if chunk.choices and (delta := chunk.choices[0].delta.content):
+                parts.append(delta)
+                yield delta
+        
+        await self._response_cache.set(key, "".join(parts))
+    
+    async def _wait_for_chunk(self, chunks: AsyncIterator[Any], start_time: float) -> Optional[Any]:
+        """Wait for the next stream chunk, logging progress every two seconds until it arrives"""
+        next_chunk = asyncio.ensure_future(anext(chunks, None))
+        try:
+            while not (await asyncio.wait({next_chunk}, timeout=2.0))[0]:
+                self.workflow_logger.log_working(f"Thinking for {time.time() - start_time:.1f}s...")
+            return next_chunk.result()
+        finally:
+            next_chunk.cancel()
+    
+    def _prepare_chat(self, message: str, source: str) -> List[Dict[str, str]]:
+        """Record the user message and build the conversation for the AI"""
+        # Reset workflow logger for new conversation
+        self.workflow_logger.reset()
+        self.workflow_logger.log_step("Starting new conversation", details=f"Message: {message[:100]}...")
+        
+        # Start or continue conversation
+        if not self.chat_memory.current_conversation:
+            self.workflow_logger.log_step("Initializing conversation context")
+            self.chat_memory.start_conversation(self.workspace_path)
+        
+        # Add user message to memory with source
+        self.chat_memory.add_message("user", message, metadata={"source": source})
+        
+        # Get conversation context
+        self.workflow_logger.log_step("Preparing conversation context")
+        context = self.chat_memory.get_conversation_context()
+        recent_messages = self.chat_memory.get_recent_messages()
+        
+        # Prepare the conversation for the AI as one system message, static part first
+        self.workflow_logger.log_step("Building conversation history")
+        system_parts = [self._personality_prompt]
+        
+        # Add project context
+        if self.workspace_path:
+            system_parts.append(f"""Your workspace context:
+    - Project: {self.project_name}
+    - Location: {self.workspace_path}
+    
+    You are actively working in the project '{self.project_name}' located at {self.workspace_path}.
     You have full access to read and modify files in this workspace. Use this access to provide concrete, specific help.
     
     IMPORTANT: For any file operations or tool usage:
     1. Always log what you're doing
     2. Show progress during long operations
-    3. Confirm when operations are complete"""
-                })
-            
-            # Add conversation context and history
-            if context:
-                messages.append({
-                    "role": "system",
-                    "content": f"Current conversation context: {json.dumps(context)}"
-                })
-            
-            for msg in recent_messages:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # Get response from OpenAI
-            self.workflow_logger.log_step("Thinking about response", "GPT-4", "Analyzing request and planning actions")
-            start_time = time.time()
-            last_update = time.time()
-            
-            # Create the API call task
-            api_task = asyncio.create_task(
-                self.client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=messages,
-                    temperature=0.7
-                )
-            )
-            
-            # Show progress while waiting
-            while not api_task.done():
-                current_time = time.time()
-                if current_time - last_update >= 2.0:
-                    duration = current_time - start_time
-                    self.workflow_logger.log_working(f"Thinking for {duration:.1f}s...")
-                    last_update = current_time
-                await asyncio.sleep(0.1)
-            
-            # Get the response
-            response = await api_task
-            
-            # Extract and store the response
-            assistant_message = response.choices[0].message.content
-            self.chat_memory.add_message("assistant", assistant_message, metadata={"source": source})
-            
-            # Try to identify if this is a coding task
-            task_type = self._identify_task_type(message)
-            if task_type:
-                self.workflow_logger.log_step(f"Identified task type: {task_type}")
-                # Create and process a coding task
-                task = CodingTask(
-                    task_type=task_type,
-                    description=message,
-                    context=self._create_context_from_workspace()
-                )
-                task_response = await self.process_task(task)
+    3. Confirm when operations are complete""")
+        
+        # Add conversation context
+        if context:
+            system_parts.append(f"Current conversation context: {orjson.dumps(context).decode()}")
+        
+        system_prompt = "\n\n".join(system_parts)
+        
+        # Add as much history as fits the token budget, newest first; the latest message is always kept
+        budget = CHAT_TOKEN_BUDGET - count_tokens(system_prompt)
+        history = []
+        for msg in reversed(recent_messages):
+            budget -= count_tokens(msg.content)
+            if budget < 0 and history:
+                break
+            history.append({"role": msg.role, "content": msg.content})
+        
+        messages = [{"role": "system", "content": system_prompt}, *reversed(history)]
+        return messages
+    
+    async def _run_chat_task(self, message: str, task_type: str, task_logger: WorkflowLogger) -> CodeResponse:
+        """Create and process the coding task requested in a chat message"""
+        # Runs in its own asyncio task, so this only redirects the task's logging
+        _task_logger.set(task_logger)
+        self.workflow_logger.log_step(f"Identified task type: {task_type}")
+        task = CodingTask(
+            task_type=task_type,
+            description=message,
+            context=await self._create_context_from_workspace()
+        )
+        return await self.process_task(task)
+    
+    async def _chat_follow_up(
+        self,
+        message: str,
+        words: frozenset,
+        task_type: Optional[str],
+        task_run: Optional[asyncio.Task],
+        task_logger: WorkflowLogger,
+        start_time: float,
+        emit: Callable[[str], None] = lambda event: None
+    ) -> Optional[str]:
+        """Collect the result of any coding task or file operation requested in the message; failures are an ErrorReply"""
+        # Wait for the coding task started alongside the reply
+        if task_run is not None:
+            emit(f"task:{task_type}")
+            try:
+                task_response = await task_run
+            finally:
+                task_logger.flush()
+            self.workflow_logger.log_step("Task completed", details="Combined conversation and task responses")
+            # process_task reports failures as a response; keep them marked as errors
+            if task_response.explanation == "An error occurred":
+                return ErrorReply(task_response.solution)
+            return task_response.solution
+        
+        # If this is a file operation request, handle it with logging
+        if words & _FILE_KW:
+            emit("tool:file_scan")
+            self.workflow_logger.log_step("File operation requested", "File System", details="Scanning repository...")
+            try:
+                # Create a task for file operations
+                file_task = asyncio.create_task(self._handle_file_operation(message))
                 
-                # Combine conversational and task responses
-                combined_response = f"{assistant_message}\n\n{task_response.solution}"
-                self.workflow_logger.log_step("Task completed", details="Combined conversation and task responses")
-                return combined_response
-            
-            # If this is a file operation request, handle it with logging
-            if any(keyword in message.lower() for keyword in ['file', 'directory', 'folder', 'repo', 'repository', 'count']):
-                self.workflow_logger.log_step("File operation requested", "File System", details="Scanning repository...")
-                try:
-                    # Create a task for file operations
-                    file_task = asyncio.create_task(self._handle_file_operation(message))
-                    
-                    # Show progress while waiting
-                    while not file_task.done():
-                        current_time = time.time()
-                        if current_time - last_update >= 2.0:
-                            duration = current_time - start_time
-                            self.workflow_logger.log_working(f"Scanning files for {duration:.1f}s...")
-                            last_update = current_time
-                        await asyncio.sleep(0.1)
-                    
-                    # Get the operation result
-                    operation_result = await file_task
-                    self.workflow_logger.log_result(True, "File operation completed")
-                    
-                    # Combine with the assistant's message
-                    combined_response = f"{assistant_message}\n\n{operation_result}"
-                    return combined_response
-                    
-                except Exception as e:
-                    self.workflow_logger.log_result(False, f"File operation failed: {str(e)}")
-                    return f"{assistant_message}\n\nI encountered an error while checking the files: {str(e)}"
-            
-            self.workflow_logger.log_step("Response ready", details="Conversation complete")
-            return assistant_message
-            
-        except Exception as e:
-            error_message = f"I encountered a technical issue: {str(e)}. I'll adjust my approach to resolve this."
-            self.chat_memory.add_message("assistant", error_message, metadata={"source": source})
-            self.workflow_logger.log_result(False, str(e))
-            return error_message
+                # Show progress while waiting
+                while True:
+                    done, _ = await asyncio.wait({file_task}, timeout=2.0)
+                    if file_task in done:
+                        break
+                    self.workflow_logger.log_working(f"Scanning files for {time.time() - start_time:.1f}s...")
+                
+                # Get the operation result
+                operation_result = await file_task
+                self.workflow_logger.log_result(True, "File operation completed")
+                return operation_result
+                
+            except Exception as e:
+                self.workflow_logger.log_result(False, f"File operation failed: {str(e)}")
+                return ErrorReply(f"I encountered an error while checking the files: {str(e)}")
+        
+        self.workflow_logger.log_step("Response ready", details="Conversation complete")
+        return None
+    
+    def _chat_error(self, error: Exception, source: str) -> ErrorReply:
+        """Record a failed chat turn and return the message shown to the user"""
+        error_message = f"I encountered a technical issue: {str(error)}. I'll adjust my approach to resolve this."
+        self.chat_memory.add_message("assistant", error_message, metadata={"source": source})
+        self.workflow_logger.log_result(False, str(error))
+        return ErrorReply(error_message)
     
     def _get_personality_prompt(self) -> str:
         """Generate the personality prompt for the AI"""
@@ -251,10 +602,6 @@ You communicate in a {self.personality['style']} manner, drawing from years of s
 You have direct access to the following capabilities:
 {capabilities}
 
-Your workspace context:
-- Project: {self.project_name if self.project_name else 'Not yet determined'}
-- Location: {self.workspace_path if self.workspace_path else 'Not yet determined'}
-
 You should:
 1. Be confident in your ability to directly access and modify code
 2. Actively use your file system access to help users
@@ -266,47 +613,46 @@ You should:
 
 IMPORTANT: You have DIRECT access to the file system and can read/write code. Never suggest that you don't have access. Instead, use your capabilities to help users effectively."""
     
-    def _identify_task_type(self, message: str) -> Optional[str]:
+    def _identify_task_type(self, message: str, words: Optional[frozenset] = None) -> Optional[str]:
         """Try to identify if the message contains a coding task"""
-        message_lower = message.lower()
+        words = words if words is not None else _tokenize(message)
         
-        if any(keyword in message_lower for keyword in ["analyze", "review", "check", "look at"]):
+        if words & _ANALYZE_KW or "look at" in message.lower():
             return "analyze"
-        elif any(keyword in message_lower for keyword in ["generate", "create", "write", "implement"]):
+        elif words & _GENERATE_KW:
             return "generate"
-        elif any(keyword in message_lower for keyword in ["review pr", "review pull request", "check pr"]):
+        elif any(phrase in message.lower() for phrase in _REVIEW_PHRASES):
             return "review"
         
         return None
     
-    def _create_context_from_workspace(self) -> CodeContext:
+    async def _create_context_from_workspace(self) -> CodeContext:
         """Create a CodeContext from the current workspace"""
         if not self.workspace_path:
             return CodeContext(files={})
         
-        # Get relevant files from the workspace
-        files = {}
+        # Index the workspace's source files; they are only read once a task picks them
         try:
-            for root, _, filenames in os.walk(self.workspace_path):
-                for filename in filenames:
-                    if filename.endswith(('.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.h')):
-                        file_path = os.path.join(root, filename)
-                        with open(file_path, 'r') as f:
-                            content = f.read()
-                        rel_path = os.path.relpath(file_path, self.workspace_path)
-                        files[rel_path] = content
+            files = await asyncio.to_thread(LazyFileMap.scan, self.workspace_path, self._file_cache)
         except Exception:
-            pass
+            files = {}
         
         return CodeContext(
             files=files,
             project_root=self.workspace_path
         )
     
+    async def _resolve_files(self, task: CodingTask) -> CodingTask:
+        """Replace a lazy file map with the contents of the files relevant to the task"""
+        lazy_files = task.context.files
+        selected = await asyncio.to_thread(lazy_files.select, task.description)
+        files = await lazy_files.load(selected)
+        return task.model_copy(update={"context": task.context.model_copy(update={"files": files})})
+    
     async def process_task(self, task: CodingTask) -> CodeResponse:
         """Process a coding task and return a response"""
         # For initial testing, just return a simple response
-        if task.description.lower() in {'hi', 'hello', 'test'}:
+        if task.description.lower() in GREETINGS:
             return CodeResponse(
                 solution=f"👋 Hello! I'm Codi, your AI senior software developer. I'm currently working in the {self.project_name} project and have full access to the codebase. Let's write some excellent code together.",
                 explanation="Greeting message",
@@ -314,6 +660,10 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
                 code_changes=None
             )
         
+        # Read only the workspace files this task needs
+        if isinstance(task.context.files, LazyFileMap):
+            task = await self._resolve_files(task)
+        
         # Update context
         self.current_context = task.context
         
@@ -344,18 +694,11 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
             prompt = self._prepare_analysis_prompt(task)
             
             # Get analysis from OpenAI
-            response = await self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a senior software developer performing code analysis. Be thorough but concise."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2
+            analysis = await self._complete(
+                self._build_messages(_ANALYSIS_SYSTEM_PROMPT, prompt),
+                custom_id="analysis"
             )
             
-            # Extract and structure the analysis
-            analysis = response.choices[0].message.content
-            
             # Return structured response
             return CodeResponse(
                 solution=analysis,
@@ -366,6 +709,43 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
         except Exception as e:
             raise Exception(f"Error during code analysis: {str(e)}")
     
+    @log_workflow("Analyzing batched tasks")
+    async def analyze_batch(self, tasks: List[CodingTask]) -> List[CodeResponse]:
+        """Analyze several tasks with one request, returning one response per task in order"""
+        # Read only the workspace files each task needs
+        tasks = [
+            await self._resolve_files(task) if isinstance(task.context.files, LazyFileMap) else task
+            for task in tasks
+        ]
+        
+        buf = io.StringIO()
+        for index, task in enumerate(tasks, start=1):
+            if index > 1:
+                buf.write("\n\n")
+            buf.write(f"# Task {index}\n\n")
+            buf.write(self._prepare_analysis_prompt(task))
+        
+        content = await self._complete(
+            self._build_messages(f"{_ANALYSIS_SYSTEM_PROMPT}\n\n{_BATCH_ANALYSIS_INSTRUCTIONS}", buf.getvalue()),
+            custom_id="analysis_batch",
+            response_format={"type": "json_object"}
+        )
+        
+        # Split the reply per task; any gap fails the whole batch
+        results = orjson.loads(content)["results"]
+        analyses = {int(result["index"]): result["analysis"] for result in results}
+        if sorted(analyses) != list(range(1, len(tasks) + 1)):
+            raise ValueError("Batched response does not cover every task")
+        
+        return [
+            CodeResponse(
+                solution=analyses[index],
+                explanation="Code analysis completed successfully",
+                suggestions=self._extract_suggestions(analyses[index])
+            )
+            for index in range(1, len(tasks) + 1)
+        ]
+    
     @log_workflow("Generating new code")
     async def _generate_code(self, task: CodingTask) -> CodeResponse:
         """Generate new code based on requirements"""
@@ -374,39 +754,27 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
             prompt = self._prepare_generation_prompt(task)
             
             # Get code generation from OpenAI
-            response = await self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a senior software developer generating production-ready code. "
-                                 "Focus on writing clean, efficient, and well-documented code that follows best practices."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2
+            generated_code = await self._complete(
+                self._build_messages(_GENERATION_SYSTEM_PROMPT, prompt),
+                custom_id="gen_initial",
+                batchable=True
             )
             
-            # Extract the generated code
-            generated_code = response.choices[0].message.content
-            
             # Get additional explanation and suggestions
-            explanation_response = await self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a senior software developer explaining generated code."},
-                    {"role": "user", "content": prompt},
+            explanation = await self._complete(
+                self._build_messages(
+                    _GENERATION_SYSTEM_PROMPT,
+                    prompt,
                     {"role": "assistant", "content": generated_code},
                     {
                         "role": "user",
                         "content": "Provide a brief explanation of the code and any important implementation notes or suggestions."
                     }
-                ],
-                temperature=0.2
+                ),
+                custom_id="gen_explanation",
+                batchable=True
             )
             
-            explanation = explanation_response.choices[0].message.content
-            
             # Parse the generated code to identify file changes
             code_changes = self._parse_code_changes(generated_code)
             
@@ -427,45 +795,21 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
             # Prepare the review prompt
             prompt = self._prepare_review_prompt(task)
             
-            # Get initial review from OpenAI
-            review_response = await self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a senior software developer performing a thorough code review. "
-                                 "Be specific, constructive, and provide actionable feedback with examples."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2
-            )
-            
-            review = review_response.choices[0].message.content
-            
-            # Get specific suggestions and code improvements
-            improvement_response = await self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a senior software developer providing specific code improvements."},
-                    {"role": "user", "content": prompt},
-                    {"role": "assistant", "content": review},
-                    {
-                        "role": "user",
-                        "content": "Based on the review, provide specific code improvements and refactoring suggestions. "
-                                 "Include code examples for the most important changes."
-                    }
-                ],
-                temperature=0.2
-            )
-            
-            improvements = improvement_response.choices[0].message.content
+            # Get the review, improvements and suggestions from OpenAI in a single call
+            result = orjson.loads(await self._complete(
+                self._build_messages(_REVIEW_SYSTEM_PROMPT, prompt),
+                custom_id="review",
+                batchable=True,
+                response_format=_REVIEW_RESPONSE_FORMAT
+            ))
+            review = result["review"]
+            improvements = result["improvements"]
             
             # Parse any code changes suggested in the improvements
             code_changes = self._parse_code_changes(improvements)
             
             # Extract actionable suggestions
-            all_suggestions = self._extract_suggestions(review + "\n" + improvements)
+            all_suggestions = result["suggestions"] or self._extract_suggestions(review + "\n" + improvements)
             
             # Prioritize suggestions
             critical_suggestions = []
@@ -480,6 +824,7 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
             prioritized_suggestions = critical_suggestions + normal_suggestions
             
             # Combine review and improvements into a structured response
+            suggestion_lines = "".join(f"\n{suggestion}" for suggestion in prioritized_suggestions)
             solution = f"""# Code Review Summary
 
 ## General Review
@@ -489,7 +834,7 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
 {improvements}
 
 ## Prioritized Suggestions
-{"".join(f"\\n{suggestion}" for suggestion in prioritized_suggestions)}
+{suggestion_lines}
 """
             
             return CodeResponse(
@@ -502,179 +847,135 @@ IMPORTANT: You have DIRECT access to the file system and can read/write code. Ne
         except Exception as e:
             raise Exception(f"Error during code review: {str(e)}")
     
-    def _prepare_analysis_prompt(self, task: CodingTask) -> str:
-        """Prepare the prompt for code analysis"""
-        context = task.context
-        files_content = "\n\n".join(
-            f"File: {path}\n```\n{content}\n```"
-            for path, content in context.files.items()
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        custom_id: str = "request",
+        batchable: bool = False,
+        **kwargs
+    ) -> str:
+        """Get a chat completion, reusing the cached result for an identical request"""
+        body = {"model": OPENAI_MODEL, "messages": messages, "temperature": 0.2, **kwargs}
+        key = make_key(body)
+        if (cached := await self._response_cache.get(key)) is not None:
+            return cached
+        
+        # Only batchable (generate/review) calls wait on the Batch API; analysis stays interactive
+        content = await self._request_completion(body, custom_id, batchable and self.batch_mode)
+        await self._response_cache.set(key, content)
+        return content
+    
+    async def _request_completion(self, body: Dict[str, Any], custom_id: str, batch: bool = False) -> str:
+        """Send a chat completion request, through the Batch API if batch is set"""
+        if not batch:
+            response = await self.client.chat.completions.create(**body)
+            return response.choices[0].message.content
+        
+        # Submit a one-request batch and wait for it to finish
+        request = {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", orjson.dumps(request)),
+            purpose="batch"
         )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        while batch.status not in BATCH_FINAL_STATES:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await self.client.batches.retrieve(batch.id)
         
-        return f"""As a senior software developer, analyze the following code:
-
-{files_content}
-
-Focus on:
-1. Code structure and organization
-2. Potential bugs or issues
-3. Performance considerations
-4. Best practices and patterns
-5. Security concerns
-6. Suggestions for improvement
-
-Task description: {task.description}"""
+        if batch.status != "completed" or not batch.output_file_id:
+            raise Exception(f"Batch {batch.id} finished with status '{batch.status}'")
+        
+        output = await self.client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            result = orjson.loads(line)
+            if result["custom_id"] == custom_id:
+                return result["response"]["body"]["choices"][0]["message"]["content"]
+        raise Exception(f"Batch {batch.id} returned no result for '{custom_id}'")
+    
+    def _build_messages(self, system_prompt: str, prompt: str, *turns: Dict[str, str]) -> List[Dict[str, str]]:
+        """Build a conversation with the static system prompt first and dynamic content last"""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+            *turns
+        ]
+    
+    def _write_files(self, buf: io.StringIO, files: Mapping[str, str]):
+        """Write each file as a fenced code block, separated by blank lines"""
+        for index, (path, content) in enumerate(files.items()):
+            if index:
+                buf.write("\n\n")
+            buf.write(f"File: {path}\n```\n")
+            buf.write(content)
+            buf.write("\n```")
+    
+    def _prepare_analysis_prompt(self, task: CodingTask) -> str:
+        """Prepare the prompt for code analysis"""
+        buf = io.StringIO()
+        buf.write("Analyze the following code:\n\n")
+        self._write_files(buf, task.context.files)
+        buf.write(f"\n\nTask description: {task.description}")
+        return buf.getvalue()
 
     def _prepare_generation_prompt(self, task: CodingTask) -> str:
         """Prepare the prompt for code generation"""
         context = task.context
+        buf = io.StringIO()
         
         # Include existing files for context if any
-        context_str = ""
         if context.files:
-            context_str = "\nExisting project files:\n" + "\n\n".join(
-                f"File: {path}\n```\n{content}\n```"
-                for path, content in context.files.items()
-            )
+            buf.write("Existing project files:\n")
+            self._write_files(buf, context.files)
+            buf.write("\n\n")
         
         # Include language preference if specified
-        language_str = f"\nPreferred language: {context.language}" if context.language else ""
+        if context.language:
+            buf.write(f"Preferred language: {context.language}\n\n")
         
         # Include specific requirements if any
-        requirements_str = ""
         if task.requirements:
-            requirements_str = "\nSpecific requirements:\n" + "\n".join(
-                f"- {req}" for req in task.requirements
-            )
+            buf.write("Specific requirements:\n")
+            buf.write("\n".join(f"- {req}" for req in task.requirements))
+            buf.write("\n\n")
         
-        return f"""As a senior software developer, generate code based on the following:
-
-Task description: {task.description}
-{language_str}
-{requirements_str}
-{context_str}
-
-Please ensure the code:
-1. Follows best practices and design patterns
-2. Is well-documented and maintainable
-3. Handles edge cases and errors appropriately
-4. Is efficient and performant
-5. Includes necessary imports and dependencies
-6. Is security-conscious
-
-Generate complete, production-ready code that can be used immediately."""
+        buf.write(f"Generate code for the following task description: {task.description}")
+        return buf.getvalue()
 
     def _prepare_review_prompt(self, task: CodingTask) -> str:
         """Prepare the prompt for code review"""
-        context = task.context
-        
-        # Prepare the code to be reviewed
-        files_content = "\n\n".join(
-            f"File: {path}\n```\n{content}\n```"
-            for path, content in context.files.items()
-        )
-        
-        return f"""As a senior software developer, perform a comprehensive code review of the following code:
-
-{files_content}
-
-Task description: {task.description}
-
-Please analyze the code for:
-1. Code Quality:
-   - Clean code principles
-   - Design patterns usage
-   - Code organization
-   - Naming conventions
-   - Documentation quality
-
-2. Functionality:
-   - Logic correctness
-   - Edge cases handling
-   - Error handling
-   - API consistency
-
-3. Performance:
-   - Algorithmic efficiency
-   - Resource usage
-   - Potential bottlenecks
-   - Optimization opportunities
-
-4. Security:
-   - Potential vulnerabilities
-   - Input validation
-   - Authentication/Authorization issues
-   - Data protection
-
-5. Maintainability:
-   - Code complexity
-   - Test coverage
-   - Dependencies
-   - Technical debt
-
-6. Best Practices:
-   - Language-specific conventions
-   - Framework usage
-   - Modern practices
-   - Industry standards
-
-Provide specific, actionable feedback with code examples where relevant."""
+        buf = io.StringIO()
+        buf.write("Perform a comprehensive code review of the following code:\n\n")
+        self._write_files(buf, task.context.files)
+        buf.write(f"\n\nTask description: {task.description}")
+        return buf.getvalue()
 
     def _extract_suggestions(self, analysis: str) -> List[str]:
         """Extract actionable suggestions from the analysis"""
         # Simple extraction based on common patterns
-        suggestions = []
-        lines = analysis.split("\n")
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ["suggest", "recommend", "consider", "should", "could"]):
-                suggestions.append(line.strip())
-        
-        return suggestions
+        return [match.group(0).strip() for match in _SUGG_RE.finditer(analysis)]
     
     def _parse_code_changes(self, generated_code: str) -> Dict[str, str]:
         """Parse the generated code to identify file changes"""
         changes = {}
-        current_file = None
-        current_content = []
-        
-        lines = generated_code.split("\n")
-        for line in lines:
-            # Look for file markers in common formats
-            if line.startswith("```") and len(line) > 3:
-                # Close previous file if any
-                if current_file and current_content:
-                    changes[current_file] = "\n".join(current_content)
-                    current_content = []
-                
-                # Extract filename from markdown code block
-                lang_or_file = line[3:].strip()
-                if "/" in lang_or_file or "." in lang_or_file:
-                    current_file = lang_or_file.split()[0]  # Handle cases like ```python file.py
-                continue
-            
-            if line.startswith("File: ") or line.startswith("filename: "):
-                # Close previous file if any
-                if current_file and current_content:
-                    changes[current_file] = "\n".join(current_content)
-                    current_content = []
-                
-                current_file = line.split(": ", 1)[1].strip()
-                continue
-            
-            if line.startswith("```") and len(line) == 3:
-                # End of a code block
-                if current_file and current_content:
-                    changes[current_file] = "\n".join(current_content)
-                    current_file = None
-                    current_content = []
+        header = None
+        for match in _BLOCK_RE.finditer(generated_code):
+            # A header names the next code block, even with prose in between
+            if match.group("header") is not None:
+                header = match.group("header")
                 continue
             
-            if current_file:
-                current_content.append(line)
-        
-        # Handle the last file if any
-        if current_file and current_content:
-            changes[current_file] = "\n".join(current_content)
+            # The fence info may name the file (```src/app.py or ```python app.py), or a header line may
+            filename = next(
+                (word for word in match.group("info").split() if "/" in word or "." in word),
+                header
+            )
+            header = None
+            if filename and match.group("body"):
+                changes[filename] = match.group("body")
         
         return changes
     
@@ -686,31 +987,15 @@ Provide specific, actionable feedback with code examples where relevant."""
             if not self.workspace_path:
                 return "I don't have a workspace path configured. Please make sure you're in a valid project directory."
             
-            # Count files and get structure
-            file_count = 0
-            dir_count = 0
-            file_types = {}
-            
-            for root, dirs, files in os.walk(self.workspace_path):
-                # Skip hidden directories and common ignore paths
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'venv', '__pycache__']]
-                
-                dir_count += len(dirs)
-                file_count += len(files)
-                
-                # Count file types
-                for file in files:
-                    if file.startswith('.'):
-                        continue
-                    ext = os.path.splitext(file)[1] or 'no extension'
-                    file_types[ext] = file_types.get(ext, 0) + 1
+            # Count files and get structure; hidden directories and common ignore paths are skipped
+            file_count, dir_count, file_types = await asyncio.to_thread(scan_stats, self.workspace_path)
             
             # Format the response
             response = f"Repository Statistics:\n"
             response += f"- Total files: {file_count}\n"
             response += f"- Total directories: {dir_count}\n"
             response += "\nFile types:\n"
-            for ext, count in sorted(file_types.items(), key=lambda x: x[1], reverse=True):
+            for ext, count in file_types.most_common():
                 response += f"- {ext}: {count} files\n"
             
             self.workflow_logger.log_result(True, f"Found {file_count} files in {dir_count} directories")
@@ -0,0 +1,95 @@
+from typing import List, Optional, Set, Tuple
+import asyncio
+import logging
+from .agent import CodiAgent, CodingTask, CodeResponse, GREETINGS
+
+logger = logging.getLogger(__name__)
+
+# Only single-call task types can share one LLM request
+BATCHABLE_TASK_TYPES = {"analyze"}
+
+class TaskBatcher:
+    """Coalesces bursts of small tasks into a single LLM request"""
+
+    def __init__(self, agent: CodiAgent, window: float = 0.02, max_batch: int = 8):
+        self.agent = agent
+        self.window = window  # How long to wait for more tasks after the first one
+        self.max_batch = max_batch
+        self._queue: "asyncio.Queue[Tuple[CodingTask, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._pending: Set[asyncio.Future] = set()  # Futures of submitted tasks not yet answered
+
+    def start(self):
+        """Start collecting queued tasks into batches"""
+        self._worker = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """Stop the batcher, cancel any batches still running and fail every task left waiting"""
+        for task in [self._worker, *self._batches]:
+            if task:
+                task.cancel()
+        await asyncio.gather(*[t for t in [self._worker, *self._batches] if t], return_exceptions=True)
+        self._worker = None
+        
+        # Queued and in-flight tasks would otherwise wait forever
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError("Task batcher stopped"))
+
+    async def submit(self, task: CodingTask) -> CodeResponse:
+        """Process a task, batching it with others submitted at the same time"""
+        if (
+            task.task_type not in BATCHABLE_TASK_TYPES
+            or task.description.lower() in GREETINGS
+            or self._worker is None
+        ):
+            return await self.agent.process_task(task)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        await self._queue.put((task, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch and (remaining := deadline - loop.time()) > 0:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Keep a reference so the batch isn't garbage collected mid-flight
+            batch_task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(batch_task)
+            batch_task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[CodingTask, asyncio.Future]]):
+        if len(batch) > 1:
+            try:
+                responses = await self.agent.analyze_batch([task for task, _ in batch])
+                for (_, future), response in zip(batch, responses):
+                    if not future.done():
+                        future.set_result(response)
+                return
+            except Exception as e:
+                # Fall back to processing each task on its own
+                logger.warning(f"Batched request failed, retrying individually: {e!r}")
+
+        await asyncio.gather(*(self._run_single(task, future) for task, future in batch))
+
+    async def _run_single(self, task: CodingTask, future: asyncio.Future):
+        try:
+            response = await self.agent.process_task(task)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(response)
@@ -0,0 +1,147 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+from collections import OrderedDict
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def make_key(payload: Any) -> str:
+    """Build a stable cache key from any JSON-serializable payload"""
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def normalize_text(text: str) -> str:
+    """Normalize free text so trivially different prompts share a cache entry"""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+def create_redis():
+    """Connect to Redis when REDIS_URL is configured, otherwise return None"""
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    import redis.asyncio as redis
+    return redis.Redis.from_url(url)
+
+class ResponseCache:
+    """Bounded in-process LRU cache for agent responses, optionally backed by Redis"""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        redis: Optional[Any] = None,
+        prefix: str = "codi:resp:",
+        ttl: int = 86400,
+        timeout: float = 0.05,
+        encode: Callable[[Any], Any] = orjson.dumps,
+        decode: Callable[[Any], Any] = orjson.loads
+    ):
+        self.maxsize = maxsize
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.timeout = timeout  # Redis stalls never delay a request by more than this
+        self.encode = encode
+        self.decode = decode
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        async with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        
+        # Fall back to the persistent tier and hydrate the in-memory one
+        if self.redis is not None:
+            try:
+                raw = await asyncio.wait_for(self.redis.get(self.prefix + key), self.timeout)
+            except Exception as e:
+                logger.warning(f"Redis lookup failed: {e!r}")
+                raw = None
+            if raw is not None:
+                value = self.decode(raw)
+                await self._store(key, value)
+                self.redis_hits += 1
+                return value
+        
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        await self._store(key, value)
+        if self.redis is not None:
+            try:
+                await asyncio.wait_for(
+                    self.redis.set(self.prefix + key, self.encode(value), ex=ttl or self.ttl),
+                    self.timeout
+                )
+            except Exception as e:
+                logger.warning(f"Redis write failed: {e!r}")
+
+    async def _store(self, key: str, value: Any):
+        async with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            elif len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+            self._entries[key] = value
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters for the cache"""
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize
+        }
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for this key, or wait for the identical call already in flight"""
+        # No await between the lookup and the insert, so this is race-free on one loop
+        if (task := self._inflight.get(key)) is None or task.cancelling():
+            # fn runs in its own task, so one caller cancelling doesn't fail the others
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Nobody is left waiting for the result, so stop computing it
+            if self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._waiters[key] == 1:
+                del self._waiters[key]
+            else:
+                self._waiters[key] -= 1
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved when nobody else was waiting
+
+    def __len__(self) -> int:
+        return len(self._inflight)
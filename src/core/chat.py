@@ -1,37 +1,72 @@
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Dict, List, Optional, Any, Union
 from datetime import datetime
-from pydantic import BaseModel
-import json
+from collections import deque
+import glob
+import msgspec
 import os
+import shutil
+import time
+import uuid
 
-class Message(BaseModel):
+class Message(msgspec.Struct, frozen=True, gc=False):
     """Represents a single message in the conversation"""
     role: str  # 'user' or 'assistant'
     content: str
-    timestamp: datetime
+    # Nanoseconds since the epoch; conversations saved by older versions hold a datetime
+    timestamp_ns: Union[int, datetime] = msgspec.field(name="timestamp")
     metadata: Optional[Dict[str, Any]] = None
+    
+    @property
+    def timestamp(self) -> datetime:
+        """When the message was added, in local time"""
+        if isinstance(self.timestamp_ns, datetime):
+            return self.timestamp_ns
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
 
-class Conversation(BaseModel):
+class Conversation(msgspec.Struct):
     """Represents an ongoing conversation with context"""
     messages: List[Message]
     context: Dict[str, Any]
+    id: str = msgspec.field(default_factory=lambda: uuid.uuid4().hex)
     workspace_path: Optional[str] = None
     current_file: Optional[str] = None
     active_task: Optional[str] = None
 
+# Message logs are rotated into .codi/conversations/archives/YYYY-MM once they reach this size
+MAX_LOG_BYTES = 1024 * 1024
+HOT_MESSAGES = 32  # Recent messages kept ready for get_recent_messages
+
+_ENCODER = msgspec.json.Encoder()
+_DECODER = msgspec.json.Decoder(Conversation)
+_MESSAGE_DECODER = msgspec.json.Decoder(Message)
+
 class ChatMemory:
     """Manages conversation history and context"""
     def __init__(self, storage_path: str = ".codi/conversations"):
         self.storage_path = storage_path
+        self.archive_path = os.path.join(storage_path, "archives")
         self.current_conversation: Optional[Conversation] = None
+        self._log: Optional[BinaryIO] = None  # Append-only message log of the current conversation
+        self._hot: deque = deque(maxlen=HOT_MESSAGES)
+        self._full_cache: Dict[str, Conversation] = {}  # filepath -> loaded conversation
         self._ensure_storage_exists()
     
     def _ensure_storage_exists(self):
         """Ensure the storage directory exists"""
         os.makedirs(self.storage_path, exist_ok=True)
     
+    def _log_path(self, conversation_id: str) -> str:
+        return os.path.join(self.storage_path, f"{conversation_id}.jsonl")
+    
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+    
     def start_conversation(self, workspace_path: Optional[str] = None) -> Conversation:
         """Start a new conversation"""
+        self._close_log()
+        self._hot.clear()
         self.current_conversation = Conversation(
             messages=[],
             context={},
@@ -44,15 +79,31 @@ class ChatMemory:
         if not self.current_conversation:
             self.start_conversation()
         
-        message = Message(
-            role=role,
-            content=content,
-            timestamp=datetime.now(),
-            metadata=metadata or {}
-        )
+        message = Message(role, content, time.time_ns(), metadata or {})
         self.current_conversation.messages.append(message)
+        self._hot.append(message)
+        
+        # Persist just this message; the log is opened on the first one
+        if self._log is None:
+            self._log = open(self._log_path(self.current_conversation.id), 'ab')
+        self._log.write(_ENCODER.encode(message) + b"\n")
+        self._log.flush()
+        if self._log.tell() >= MAX_LOG_BYTES:
+            self._rotate_log()
         return message
     
+    def _rotate_log(self):
+        """Move the message log into this month's archive and start a fresh one"""
+        conversation_id = self.current_conversation.id
+        month_path = os.path.join(self.archive_path, datetime.now().strftime("%Y-%m"))
+        os.makedirs(month_path, exist_ok=True)
+        
+        self._close_log()
+        log_path = self._log_path(conversation_id)
+        with open(log_path, 'rb') as src, open(os.path.join(month_path, f"{conversation_id}.jsonl"), 'ab') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(log_path)
+    
     def get_conversation_context(self) -> Dict[str, Any]:
         """Get the current conversation context"""
         if not self.current_conversation:
@@ -69,30 +120,63 @@ class ChatMemory:
         """Get the most recent messages"""
         if not self.current_conversation:
             return []
+        if 0 < limit <= HOT_MESSAGES:
+            return list(self._hot)[-limit:]
         return self.current_conversation.messages[-limit:]
     
     def save_conversation(self) -> str:
-        """Save the current conversation to disk"""
+        """Save a snapshot of the current conversation's context; messages are already in its log"""
         if not self.current_conversation:
             return ""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"conversation_{timestamp}.json"
-        filepath = os.path.join(self.storage_path, filename)
-        
-        with open(filepath, 'w') as f:
-            json.dump(self.current_conversation.dict(), f, default=str)
+        filepath = os.path.join(self.storage_path, f"{self.current_conversation.id}.json")
+        snapshot = msgspec.structs.replace(self.current_conversation, messages=[])
+        with open(filepath, 'wb') as f:
+            f.write(_ENCODER.encode(snapshot))
+        self._full_cache.pop(filepath, None)
         
         return filepath
     
     def load_conversation(self, filepath: str) -> Conversation:
-        """Load a conversation from disk"""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            conversation = Conversation(**data)
-            self.current_conversation = conversation
+        """Load a conversation from disk, or from memory if it was already loaded"""
+        conversation = self._full_cache.get(filepath)
+        if conversation is not None:
+            self._set_current(conversation)
             return conversation
+        
+        with open(filepath, 'rb') as f:
+            conversation = _DECODER.decode(f.read())
+        
+        if conversation.messages:
+            # Older saves hold the full history and no id; name the conversation after the file so
+            # the migrated message log is found again on the next load
+            conversation.id = os.path.splitext(os.path.basename(filepath))[0]
+            log_path = self._log_path(conversation.id)
+            if not os.path.exists(log_path):
+                with open(log_path, 'wb') as f:
+                    f.write(b"".join(_ENCODER.encode(message) + b"\n" for message in conversation.messages))
+        else:
+            # Archived months first, then the active log
+            log_path = self._log_path(conversation.id)
+            logs = sorted(glob.glob(os.path.join(self.archive_path, "*", f"{conversation.id}.jsonl")))
+            if os.path.exists(log_path):
+                logs.append(log_path)
+            for path in logs:
+                with open(path, 'rb') as f:
+                    conversation.messages.extend(_MESSAGE_DECODER.decode_lines(f.read()))
+        
+        self._full_cache[filepath] = conversation
+        self._set_current(conversation)
+        return conversation
+    
+    def _set_current(self, conversation: Conversation):
+        self._close_log()
+        self.current_conversation = conversation
+        self._hot.clear()
+        self._hot.extend(conversation.messages[-HOT_MESSAGES:])
     
     def clear_conversation(self):
         """Clear the current conversation"""
-        self.current_conversation = None 
\ No newline at end of file
+        self._close_log()
+        self._hot.clear()
+        self.current_conversation = None
\ No newline at end of file
@@ -0,0 +1,141 @@
+from typing import Any, List, Optional, Tuple
+from functools import lru_cache
+import importlib.util
+import asyncio
+import logging
+import os
+import threading
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Global configuration
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+MODEL_LOCK_PATH = ".codi/cache/encoder.lock"
+MAX_ENTRIES = 10000  # Oldest entries are evicted past this, in batches of a tenth
+
+def semantic_cache_available() -> bool:
+    """Check whether the optional semantic cache dependencies are installed"""
+    return all(importlib.util.find_spec(name) is not None for name in ("faiss", "sentence_transformers"))
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    """Load the sentence embedding model once per process"""
+    from filelock import FileLock
+    from sentence_transformers import SentenceTransformer
+    
+    # Only one worker downloads the model; the others wait and load it from disk
+    os.makedirs(os.path.dirname(MODEL_LOCK_PATH), exist_ok=True)
+    with FileLock(MODEL_LOCK_PATH):
+        return SentenceTransformer(EMBEDDING_MODEL)
+
+class SemanticCache:
+    """Returns stored responses for prompts that are similar to earlier ones"""
+
+    def __init__(
+        self,
+        threshold: float = SIMILARITY_THRESHOLD,
+        index_path: Optional[str] = None,
+        max_entries: int = MAX_ENTRIES
+    ):
+        self.threshold = threshold
+        self.index_path = index_path
+        self.max_entries = max_entries
+        self.enabled = semantic_cache_available()
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._entries: List[Tuple[Optional[str], Any]] = []  # (scope, value) per index row
+        self._lock = threading.Lock()
+
+    async def lookup(self, text: str, scope: Optional[str] = None) -> Tuple[Optional[Any], Optional[Any]]:
+        """Embed text and return (embedding, cached value or None)"""
+        if not self.enabled:
+            return None, None
+        try:
+            return await asyncio.to_thread(self._lookup, text, scope)
+        except Exception as e:
+            # A broken encoder or index is a miss, never a failed request
+            logger.warning(f"Semantic cache lookup failed: {e!r}")
+            self.misses += 1
+            return None, None
+
+    async def insert(self, embedding: Any, value: Any, scope: Optional[str] = None):
+        """Store a value under a previously computed embedding"""
+        if embedding is None:
+            return
+        try:
+            await asyncio.to_thread(self._insert, embedding, value, scope)
+        except Exception as e:
+            logger.warning(f"Semantic cache insert failed: {e!r}")
+
+    def _lookup(self, text: str, scope: Optional[str]) -> Tuple[Any, Optional[Any]]:
+        embedding = get_encoder().encode([text], normalize_embeddings=True).astype("float32")
+        with self._lock:
+            if self._index is not None and self._index.ntotal:
+                scores, ids = self._index.search(embedding, min(4, self._index.ntotal))
+                for score, idx in zip(scores[0], ids[0]):
+                    if score < self.threshold:
+                        break
+                    entry_scope, value = self._entries[idx]
+                    if entry_scope == scope:
+                        self.hits += 1
+                        return embedding, value
+            self.misses += 1
+        return embedding, None
+
+    def _insert(self, embedding: Any, value: Any, scope: Optional[str]):
+        with self._lock:
+            if self._index is None:
+                import faiss
+                self._index = faiss.IndexFlatIP(embedding.shape[1])
+            elif self._index.ntotal >= self.max_entries:
+                # Evict the oldest rows; FAISS renumbers the rest to match the entry list
+                import numpy as np
+                evict = max(1, self.max_entries // 10)
+                self._index.remove_ids(np.arange(evict, dtype="int64"))
+                del self._entries[:evict]
+            self._index.add(embedding)
+            self._entries.append((scope, value))
+
+    def save(self):
+        """Persist the index and stored responses to disk"""
+        if not self.enabled or not self.index_path or self._index is None:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            import faiss
+            # Write both files aside first, so a crash never leaves an index without its entries
+            faiss.write_index(self._index, f"{self.index_path}.tmp")
+            with open(f"{self.index_path}.json.tmp", 'wb') as f:
+                f.write(orjson.dumps(self._entries))
+            os.replace(f"{self.index_path}.json.tmp", f"{self.index_path}.json")
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def load(self):
+        """Load a previously saved index, if one exists; a damaged one is discarded"""
+        if not self.enabled or not self.index_path or not os.path.exists(self.index_path):
+            return
+        with self._lock:
+            try:
+                import faiss
+                index = faiss.read_index(self.index_path)
+                with open(f"{self.index_path}.json", 'rb') as f:
+                    entries = [tuple(entry) for entry in orjson.loads(f.read())]
+                if index.ntotal != len(entries):
+                    raise ValueError(f"index has {index.ntotal} rows but {len(entries)} entries")
+            except Exception as e:
+                logger.warning(f"Semantic cache index could not be loaded, starting empty: {e!r}")
+                return
+            self._index = index
+            self._entries = entries
+
+    def stats(self) -> dict:
+        """Get hit/miss counters for the cache"""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries)
+        }
@@ -1,36 +1,59 @@
 import logging
-import click
-from typing import Optional
+import sys
+from typing import List, Optional
 from functools import wraps
-import time
 import asyncio
 
+# ANSI colors, rendered once; output that isn't a terminal gets plain text
+_COLOR = sys.stdout.isatty()
+_BLUE, _YELLOW, _GREEN, _RED, _RESET = (
+    ("\x1b[34m", "\x1b[33m", "\x1b[32m", "\x1b[31m", "\x1b[0m") if _COLOR else ("", "", "", "", "")
+)
+
+# Step line pieces, with the color already applied
+_TOOL_STEP = f"{_BLUE}🛠️  Step "
+_THINK_STEP = f"{_BLUE}💭 Step "
+_DETAILS = "\n   └─ "
+_LINE_END = f"{_RESET}\n"
+
+def _write(text: str):
+    # Looked up per call so redirected stdout (e.g. a rich Live display) still receives it
+    sys.stdout.write(text)
+
 class WorkflowLogger:
     """Tracks and logs Codi's workflow and tool usage in a human-readable format"""
     
-    def __init__(self):
+    def __init__(self, buffered: bool = False):
         self.step_count = 0
         self.active_tasks = []
+        # A buffered logger holds its output until flush(), e.g. while a reply is streaming
+        self._pending: Optional[List[str]] = [] if buffered else None
+    
+    def _emit(self, text: str):
+        if self._pending is not None:
+            self._pending.append(text)
+        else:
+            _write(text)
+    
+    def flush(self):
+        """Print any output a buffered logger has held back"""
+        if self._pending:
+            _write("".join(self._pending))
+            self._pending.clear()
+            sys.stdout.flush()
         
     def log_step(self, action: str, tool: Optional[str] = None, details: Optional[str] = None):
         """Log a workflow step with optional tool usage"""
         self.step_count += 1
         
-        # Format the step number with emoji based on type
+        # Build the line from the prefix for its type (emoji and color) and print it in one write
+        parts = [_TOOL_STEP if tool else _THINK_STEP, str(self.step_count), ": ", action]
         if tool:
-            prefix = f"🛠️  Step {self.step_count}"
-            tool_info = f" using {tool}"
-        else:
-            prefix = f"💭 Step {self.step_count}"
-            tool_info = ""
-            
-        # Build the log message
-        message = f"{prefix}: {action}{tool_info}"
+            parts += (" using ", tool)
         if details:
-            message += f"\n   └─ {details}"
-            
-        # Print with color
-        click.echo(click.style(message, fg="blue"))
+            parts += (_DETAILS, details)
+        parts.append(_LINE_END)
+        self._emit("".join(parts))
         
         # Track active task
         self.active_tasks.append(action)
@@ -39,7 +62,7 @@ class WorkflowLogger:
         """Show that Codi is still actively working"""
         if self.active_tasks:
             current_task = self.active_tasks[-1]
-            click.echo(click.style(f"   ⏳ {message} (on: {current_task})", fg="yellow"))
+            self._emit(f"{_YELLOW}   ⏳ {message} (on: {current_task}){_RESET}\n")
     
     def log_result(self, success: bool, message: str):
         """Log the result of a step"""
@@ -48,9 +71,13 @@ class WorkflowLogger:
             self.active_tasks.pop()
             
         if success:
-            click.echo(click.style(f"   ✅ {message}", fg="green"))
+            self._emit(f"{_GREEN}   ✅ {message}{_RESET}\n")
         else:
-            click.echo(click.style(f"   ❌ {message}", fg="red"))
+            self._emit(f"{_RED}   ❌ {message}{_RESET}\n")
+        
+        # A step is finished, so push out everything it printed
+        if self._pending is None:
+            sys.stdout.flush()
     
     def reset(self):
         """Reset the step counter and active tasks"""
@@ -69,25 +96,28 @@ def log_workflow(explanation: str):
             self.workflow_logger.log_step(explanation, tool_name)
             
             # Time the operation
-            start_time = time.time()
-            last_update = time.time()
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
             
             try:
                 # Create a task for the actual function
                 task = asyncio.create_task(func(self, *args, **kwargs))
                 
-                # While waiting for the result, show progress
-                while not task.done():
-                    current_time = time.time()
-                    if current_time - last_update >= 2.0:  # Update every 2 seconds
-                        duration = current_time - start_time
-                        self.workflow_logger.log_working(f"Working for {duration:.1f}s...")
-                        last_update = current_time
-                    await asyncio.sleep(0.1)  # Small sleep to prevent CPU spinning
+                # While waiting for the result, show progress every 2 seconds
+                try:
+                    while True:
+                        done, _ = await asyncio.wait({task}, timeout=2.0)
+                        if task in done:
+                            break
+                        self.workflow_logger.log_working(f"Working for {loop.time() - start_time:.1f}s...")
+                except asyncio.CancelledError:
+                    # asyncio.wait doesn't cancel what it waits on; stop the call with the caller
+                    task.cancel()
+                    raise
                 
                 # Get the result
                 result = await task
-                duration = time.time() - start_time
+                duration = loop.time() - start_time
                 self.workflow_logger.log_result(True, f"Completed in {duration:.2f}s")
                 return result
                 
@@ -0,0 +1,165 @@
+from typing import Counter as CounterType, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import re
+
+# Global configuration
+ALLOWED_EXTS = frozenset({'.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.h'})
+IGNORED_DIRS = frozenset({
+    'node_modules', 'venv', '.venv', '__pycache__', '.git', '.tox',
+    'dist', 'build', '.mypy_cache', '.pytest_cache'
+})
+MAX_PARALLEL_READS = 32  # Concurrent file reads when loading workspace files
+MAX_CONTEXT_FILES = 20  # Files sent with a task that doesn't name any specific file
+SCAN_WORKERS = 8  # Threads used to scan top-level directories in parallel
+
+# Path-like words in a message, e.g. "main.py" or "src/core/agent.py"
+_PATH_WORD_RE = re.compile(r"[\w./-]+")
+
+def _skip_dir(entry: os.DirEntry) -> bool:
+    return entry.name[:1] == '.' or entry.name in IGNORED_DIRS
+
+def iter_entries(root: str) -> Iterator[os.DirEntry]:
+    """Yield every file and directory under root, skipping hidden and ignored directories"""
+    # DirEntry caches the file type from readdir, so no extra stat per entry
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if _skip_dir(entry):
+                            continue
+                        stack.append(entry.path)
+                    yield entry
+        except OSError:
+            continue
+
+def iter_source_files(root: str) -> Iterator[os.DirEntry]:
+    """Yield the source files under root that Codi reads into its context"""
+    for entry in iter_entries(root):
+        if os.path.splitext(entry.name)[1] in ALLOWED_EXTS and entry.is_file():
+            yield entry
+
+def _count_entries(entries: Iterable[os.DirEntry]) -> Tuple[int, int, CounterType[str]]:
+    file_count = 0
+    dir_count = 0
+    file_types = Counter()
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            dir_count += 1
+            continue
+        file_count += 1
+        if not entry.name.startswith('.'):
+            stem, _, ext = entry.name.rpartition('.')
+            file_types['.' + ext if stem else 'no extension'] += 1
+    return file_count, dir_count, file_types
+
+def scan_stats(root: str) -> Tuple[int, int, CounterType[str]]:
+    """Count files, directories and file types under root, scanning each top-level directory in parallel"""
+    with os.scandir(root) as entries:
+        top_level = [entry for entry in entries if not (entry.is_dir(follow_symlinks=False) and _skip_dir(entry))]
+    file_count, dir_count, file_types = _count_entries(top_level)
+    
+    # Independent subtrees overlap their directory reads across threads
+    subtrees = [entry.path for entry in top_level if entry.is_dir(follow_symlinks=False)]
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        for files, dirs, types in pool.map(lambda path: _count_entries(iter_entries(path)), subtrees):
+            file_count += files
+            dir_count += dirs
+            file_types.update(types)
+    
+    return file_count, dir_count, file_types
+
+def read_file(path: str) -> str:
+    """Read a file in one call, replacing any bytes that aren't valid UTF-8"""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', 'replace')
+
+
+class FileCache:
+    """Keeps file contents between workspace scans, re-reading a file only when its mtime or size changes"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, int, str]] = {}  # path -> (mtime_ns, size, content)
+
+    def read(self, path: str) -> str:
+        """Return the file's contents, from the cache if the file is unchanged"""
+        stat = os.stat(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        
+        content = read_file(path)
+        self._entries[path] = (stat.st_mtime_ns, stat.st_size, content)
+        return content
+
+    def retain(self, paths: Iterable[str]):
+        """Evict files that are no longer in the workspace"""
+        # Snapshot the stale paths first; worker threads may be reading files in at the same time
+        for path in list(self._entries.keys() - set(paths)):
+            self._entries.pop(path, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class LazyFileMap(Mapping):
+    """Maps workspace-relative paths to file contents, reading each file only when it is accessed"""
+
+    def __init__(self, paths: Dict[str, str], file_cache: Optional[FileCache] = None):
+        self.paths = paths  # relative path -> absolute path
+        self.file_cache = file_cache if file_cache is not None else FileCache()
+
+    @classmethod
+    def scan(cls, root: str, file_cache: Optional[FileCache] = None) -> "LazyFileMap":
+        """Index the source files under root without reading them"""
+        files = cls({os.path.relpath(entry.path, root): entry.path for entry in iter_source_files(root)}, file_cache)
+        files.file_cache.retain(files.paths.values())
+        return files
+
+    def __getitem__(self, rel_path: str) -> str:
+        return self.file_cache.read(self.paths[rel_path])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def select(self, text: str, limit: int = MAX_CONTEXT_FILES) -> List[str]:
+        """Pick the files named in text, or the most recently modified ones if none are named"""
+        # A file is named by its whole basename or a trailing part of its path, so "app.py" doesn't pick up "myapp.py"
+        words = {word.rstrip(".").removeprefix("./") for word in _PATH_WORD_RE.findall(text.lower())}
+        
+        def named(rel_path: str) -> bool:
+            parts = rel_path.replace(os.sep, "/").lower().split("/")
+            return any("/".join(parts[index:]) in words for index in range(len(parts)))
+        
+        mentioned = [rel_path for rel_path in self.paths if named(rel_path)]
+        
+        def mtime(rel_path: str) -> float:
+            try:
+                return os.stat(self.paths[rel_path]).st_mtime
+            except OSError:
+                return 0.0
+        
+        # Common names like main.py can match many files, so the limit applies either way
+        return sorted(mentioned or self.paths, key=mtime, reverse=True)[:limit]
+
+    async def load(self, rel_paths: Iterable[str]) -> Dict[str, str]:
+        """Read the given files in parallel off the event loop, skipping any that can't be read"""
+        rel_paths = list(rel_paths)
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_READS)
+        
+        async def read(rel_path: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self.__getitem__, rel_path)
+        
+        contents = await asyncio.gather(*(read(rel_path) for rel_path in rel_paths), return_exceptions=True)
+        return {
+            rel_path: content
+            for rel_path, content in zip(rel_paths, contents)
+            if not isinstance(content, Exception)
+        }
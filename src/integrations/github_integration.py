@@ -1,12 +1,31 @@
 import os
-from typing import Dict, List
-from github import Github
+import asyncio
+from typing import Dict, List, Mapping, Optional
+import httpx
+from github import Github, InputGitTreeElement
 from pathlib import Path
 
+try:
+    # SIMD-accelerated decoder; same results as the stdlib one
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+# Global configuration
+GITHUB_API_URL = "https://api.github.com"
+MAX_PARALLEL_BLOBS = 16  # Concurrent blob downloads, to stay clear of secondary rate limits
+
+def _decode_content(file) -> str:
+    """Decode a file returned by the contents API; files over 1 MB come back without content"""
+    if file.encoding != "base64":
+        raise ValueError(f"Unsupported encoding: {file.encoding}")
+    return b64decode(file.content, validate=False).decode('utf-8')
+
 class GitHubPRCreator:
     def __init__(self, repo_name: str):
         """Initialize with GitHub token and repository name"""
-        self.github = Github(os.environ.get("GITHUB_TOKEN"))
+        self.token = os.environ.get("GITHUB_TOKEN")
+        self.github = Github(self.token)
         self.repo = self.github.get_repo(repo_name)
     
     def create_pull_request(
@@ -14,7 +33,7 @@ class GitHubPRCreator:
         branch_name: str,
         title: str,
         description: str,
-        file_changes: Dict[str, str]
+        file_changes: Mapping[str, str]
     ) -> str:
         """
         Create a pull request with the specified changes
@@ -32,30 +51,18 @@ class GitHubPRCreator:
             # Get the default branch
             default_branch = self.repo.default_branch
             
-            # Create a new branch
+            # Build one commit with every change on top of the default branch
             source = self.repo.get_branch(default_branch)
-            self.repo.create_git_ref(f"refs/heads/{branch_name}", source.commit.sha)
+            parent = source.commit.commit
+            elements = [
+                InputGitTreeElement(file_path, "100644", "blob", content)
+                for file_path, content in file_changes.items()
+            ]
+            tree = self.repo.create_git_tree(elements, parent.tree)
+            commit = self.repo.create_git_commit(title, tree, [parent])
             
-            # Create commits for each file
-            for file_path, content in file_changes.items():
-                try:
-                    # Try to get the file first
-                    file = self.repo.get_contents(file_path, ref=branch_name)
-                    self.repo.update_file(
-                        file_path,
-                        f"Update {file_path}",
-                        content,
-                        file.sha,
-                        branch=branch_name
-                    )
-                except Exception:
-                    # File doesn't exist, create it
-                    self.repo.create_file(
-                        file_path,
-                        f"Create {file_path}",
-                        content,
-                        branch=branch_name
-                    )
+            # Create the new branch pointing at that commit
+            self.repo.create_git_ref(f"refs/heads/{branch_name}", commit.sha)
             
             # Create the pull request
             pr = self.repo.create_pull(
@@ -74,10 +81,14 @@ class GitHubPRCreator:
         """Get the content of a file from the repository"""
         try:
             file = self.repo.get_contents(file_path, ref=ref)
-            return file.decoded_content.decode('utf-8')
+            return _decode_content(file)
         except Exception as e:
             raise Exception(f"Error reading file {file_path}: {str(e)}")
     
+    async def get_file_content_async(self, file_path: str, ref: str = None) -> str:
+        """Get the content of a file without blocking the event loop"""
+        return await asyncio.to_thread(self.get_file_content, file_path, ref)
+    
     def get_repository_files(self, path: str = "", ref: str = None) -> Dict[str, str]:
         """Recursively get all files from the repository"""
         files = {}
@@ -89,9 +100,61 @@ class GitHubPRCreator:
                 contents.extend(self.repo.get_contents(file_content.path, ref=ref))
             else:
                 try:
-                    files[file_content.path] = file_content.decoded_content.decode('utf-8')
+                    files[file_content.path] = _decode_content(file_content)
                 except Exception:
-                    # Skip binary files
+                    # Skip binary and oversized files
                     continue
         
-        return files 
\ No newline at end of file
+        return files
+    
+    async def get_repository_files_async(
+        self,
+        path: str = "",
+        ref: str = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Dict[str, str]:
+        """Get all files from the repository, listing the tree in one request and fetching blobs in parallel"""
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        api_url = f"{GITHUB_API_URL}/repos/{self.repo.full_name}"
+        prefix = f"{path.strip('/')}/" if path.strip('/') else ""
+        
+        own_client = client is None
+        client = client or httpx.AsyncClient(timeout=30.0)
+        try:
+            # One request returns every path in the tree along with its blob sha
+            response = await client.get(
+                f"{api_url}/git/trees/{ref or self.repo.default_branch}",
+                params={"recursive": "1"},
+                headers=headers
+            )
+            response.raise_for_status()
+            tree = response.json()
+            if tree.get("truncated"):
+                # Too large for a single listing; walk it directory by directory instead
+                return await asyncio.to_thread(self.get_repository_files, path, ref)
+            
+            blobs = [item for item in tree["tree"] if item["type"] == "blob" and item["path"].startswith(prefix)]
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_BLOBS)
+            
+            async def fetch(sha: str) -> Optional[str]:
+                async with semaphore:
+                    response = await client.get(f"{api_url}/git/blobs/{sha}", headers=headers)
+                response.raise_for_status()
+                try:
+                    return b64decode(response.json()["content"], validate=False).decode('utf-8')
+                except UnicodeDecodeError:
+                    # Skip binary files; API and network errors still propagate
+                    return None
+            
+            contents = await asyncio.gather(*(fetch(item["sha"]) for item in blobs))
+        finally:
+            if own_client:
+                await client.aclose()
+        
+        return {
+            item["path"]: content
+            for item, content in zip(blobs, contents)
+            if content is not None
+        }
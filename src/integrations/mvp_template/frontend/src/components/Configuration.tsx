@@ -0,0 +1,15 @@
+import React from 'react';
+
+const Configuration: React.FC = () => {
+  return (
+    <div className="bg-white rounded-lg shadow p-6">
+      <h1 className="text-2xl font-bold mb-4">Configuration</h1>
+      <p className="text-gray-600">
+        This page will allow you to configure dashboard charts and settings.
+        Coming soon in the next iteration!
+      </p>
+    </div>
+  );
+};
+
+export default Configuration;
\ No newline at end of file
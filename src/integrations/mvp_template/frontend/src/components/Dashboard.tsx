@@ -0,0 +1,29 @@
+import React from 'react';
+import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
+import { sampleData } from '../data/sampleData';
+
+const Dashboard: React.FC = () => {
+  return (
+    <div className="space-y-6">
+      <div className="bg-white rounded-lg shadow p-6">
+        <h1 className="text-2xl font-bold mb-4">Dashboard</h1>
+        <div className="h-[400px]">
+          <ResponsiveContainer width="100%" height="100%">
+            <BarChart data={sampleData}>
+              <CartesianGrid strokeDasharray="3 3" />
+              <XAxis dataKey="name" />
+              <YAxis />
+              <Tooltip />
+              <Legend />
+              <Bar dataKey="revenue" stackId="a" fill="#8884d8" name="Revenue" />
+              <Bar dataKey="expenses" stackId="a" fill="#82ca9d" name="Expenses" />
+              <Bar dataKey="profit" stackId="a" fill="#ffc658" name="Profit" />
+            </BarChart>
+          </ResponsiveContainer>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default Dashboard;
\ No newline at end of file
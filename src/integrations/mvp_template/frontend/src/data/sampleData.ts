@@ -0,0 +1,38 @@
+export const sampleData = [
+  {
+    name: 'Jan',
+    revenue: 4000,
+    expenses: 2400,
+    profit: 1600
+  },
+  {
+    name: 'Feb',
+    revenue: 3000,
+    expenses: 1398,
+    profit: 1602
+  },
+  {
+    name: 'Mar',
+    revenue: 2000,
+    expenses: 1800,
+    profit: 200
+  },
+  {
+    name: 'Apr',
+    revenue: 2780,
+    expenses: 2908,
+    profit: -128
+  },
+  {
+    name: 'May',
+    revenue: 1890,
+    expenses: 1800,
+    profit: 90
+  },
+  {
+    name: 'Jun',
+    revenue: 2390,
+    expenses: 1800,
+    profit: 590
+  },
+];
\ No newline at end of file
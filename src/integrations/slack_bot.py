@@ -1,15 +1,27 @@
 import os
 import logging
 import asyncio
-from typing import Optional
-from slack_bolt.async_app import AsyncApp
-from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Tuple
+from ..core.agent import ErrorReply
+from ..core.semantic_cache import SemanticCache
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+if TYPE_CHECKING:
+    from slack_bolt.async_app import AsyncApp
+
+# Prefer uvloop's libuv-based event loop when it is installed
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    run_async = asyncio.run
+
+# Set up logging, unless the application already has
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger(__name__)
 
 # Disable noisy loggers
@@ -17,60 +29,57 @@ logging.getLogger("slack_bolt").setLevel(logging.WARNING)
 logging.getLogger("slack_sdk").setLevel(logging.WARNING)
 logging.getLogger("asyncio").setLevel(logging.WARNING)
 
-# Initialize the Slack app with your bot token
-bot_token = os.environ.get("SLACK_BOT_TOKEN")
-if not bot_token:
-    raise ValueError("SLACK_BOT_TOKEN not found in environment variables")
+# The Slack app, created by create_app when the bot starts
+app: Optional["AsyncApp"] = None
+
+# Mentions answered by the agent at the same time; the rest wait their turn
+MAX_CONCURRENT_CHATS = 8
+_AGENT_SEM = asyncio.Semaphore(MAX_CONCURRENT_CHATS)
+
+# Near-duplicate questions in the same channel reuse the earlier answer
+semantic_cache = SemanticCache(index_path=".codi/cache/slack.faiss")
 
-# Enable debug mode for the Slack app
-app = AsyncApp(token=bot_token)
+def _section(text: str) -> dict:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
 
 def format_slack_message(text: str, suggestions: Optional[list] = None, code_changes: Optional[dict] = None) -> list:
     """Format a message for Slack with proper blocks"""
-    blocks = [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": text[:3000]  # Slack has a limit on text block size
-            }
-        }
-    ]
+    # Slack has a limit on text block size
+    return _format_blocks(text[:3000], tuple(suggestions or ()), tuple((code_changes or {}).items()))
+
+@lru_cache(maxsize=256)
+def _format_blocks(text: str, suggestions: Tuple[str, ...], code_changes: Tuple[Tuple[str, str], ...]) -> list:
+    """Build the blocks for a message once; repeated answers reuse them (callers must not modify the result)"""
+    blocks = [_section(text)]
     
     if suggestions:
         suggestions_text = "\n".join(f"• {suggestion}" for suggestion in suggestions)
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Suggestions:*\n{suggestions_text}"
-            }
-        })
+        blocks.append(_section(f"*Suggestions:*\n{suggestions_text}"))
     
-    if code_changes:
-        for file, content in code_changes.items():
-            blocks.extend([
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Changes to {file}:*"
-                    }
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"```{content[:1000]}```"
-                    }
-                }
-            ])
+    for file, content in code_changes:
+        blocks.append(_section(f"*Changes to {file}:*"))
+        blocks.append(_section(f"```{content[:1000]}```"))
     
     return blocks
 
-@app.event("app_mention")
-async def handle_mention(body, say, logger):
+def create_app() -> "AsyncApp":
+    """Create the Slack app and register its event handlers"""
+    global app
+    # slack_bolt is only imported once the bot actually starts
+    from slack_bolt.async_app import AsyncApp
+    
+    # Initialize the Slack app with your bot token
+    bot_token = os.environ.get("SLACK_BOT_TOKEN")
+    if not bot_token:
+        raise ValueError("SLACK_BOT_TOKEN not found in environment variables")
+    
+    app = AsyncApp(token=bot_token)
+    app.event("app_mention")(handle_mention)
+    return app
+
+async def handle_mention(body, say, client, logger):
     """Handle when the bot is mentioned in a channel"""
+    placeholder = None
     try:
         event = body["event"]
         user = event.get('user')
@@ -78,38 +87,66 @@ async def handle_mention(body, say, logger):
         
         logger.info(f"[Message through Slack] User {user}: {text}")
         
+        # Answer from the cache when this was already asked in the channel
+        channel = event.get("channel")
+        embedding, response = await semantic_cache.lookup(text, scope=channel)
+        if response is not None:
+            await say(blocks=format_slack_message(response))
+            logger.info(f"[Message through Slack] Codi (cached): {response[:100]}...")
+            return
+        
+        # Acknowledge right away, then fill in the answer once the agent is done
+        placeholder = await say("_Thinking…_")
+        
+        # Keep each thread (or user) on one session so follow-ups reuse the cached prompt prefix
+        session_id = f"{channel}:{event.get('thread_ts') or user}"
+        
         # Get response from the agent
-        response = await app.agent.chat(text, source="slack")
+        async with _AGENT_SEM:
+            response = await app.agent.chat(text, source="slack", session_id=session_id)
         
         # Format and send the response
         blocks = format_slack_message(response)
-        await say(blocks=blocks)
+        await client.chat_update(channel=placeholder["channel"], ts=placeholder["ts"], text=response[:3000], blocks=blocks)
+        # Don't let a failed turn answer later questions in the channel
+        if not isinstance(response, ErrorReply):
+            await semantic_cache.insert(embedding, response, scope=channel)
         
         logger.info(f"[Message through Slack] Codi: {response[:100]}...")
         
     except Exception as e:
         error_msg = f"I encountered a technical issue while processing your request: {str(e)}. Let me know if you'd like me to try a different approach."
         logger.error(f"Error in handle_mention: {str(e)}", exc_info=True)
-        await say(error_msg)
+        if placeholder is not None:
+            await client.chat_update(channel=placeholder["channel"], ts=placeholder["ts"], text=error_msg)
+        else:
+            await say(error_msg)
 
 async def start_async_slack_bot(agent):
     """Start the Slack bot in socket mode"""
     try:
+        from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+        
         app_token = os.environ.get("SLACK_APP_TOKEN")
         if not app_token:
             raise ValueError("SLACK_APP_TOKEN not found in environment variables")
         
         # Store the agent instance
+        app = create_app()
         app.agent = agent
+        semantic_cache.load()
         
         logger.info("Starting Slack bot...")
         handler = AsyncSocketModeHandler(app, app_token)
         
         logger.info("✨ Slack Interface Ready!")
-        await handler.start_async()
-        
-        # Keep the bot running
-        await asyncio.Future()  # run forever
+        try:
+            await handler.start_async()
+            
+            # Keep the bot running
+            await asyncio.Future()  # run forever
+        finally:
+            semantic_cache.save()
         
     except Exception as e:
         logger.error(f"Error starting Slack bot: {str(e)}", exc_info=True)
@@ -117,4 +154,13 @@ async def start_async_slack_bot(agent):
 
 def start_slack_bot():
     """Synchronous wrapper to start the async Slack bot"""
-    asyncio.run(start_async_slack_bot(agent)) 
\ No newline at end of file
+    from ..core.agent import CodiAgent
+    
+    async def run():
+        agent = CodiAgent()
+        try:
+            await start_async_slack_bot(agent)
+        finally:
+            await agent.aclose()
+    
+    run_async(run()) 
\ No newline at end of file
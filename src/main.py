@@ -1,7 +1,6 @@
 import os
 import asyncio
 from dotenv import load_dotenv
-from src.integrations.slack_bot import start_slack_bot
 
 def main():
     # Load environment variables
@@ -26,7 +25,8 @@ def main():
     
     print("\nStarting Codi Slack bot...")
     try:
-        # Start the bot
+        # Start the bot; the Slack stack is only imported once we know it can run
+        from src.integrations.slack_bot import start_slack_bot
         start_slack_bot()
     except KeyboardInterrupt:
         print("\nShutting down gracefully...")
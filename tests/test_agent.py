@@ -0,0 +1,115 @@
+import asyncio
+import types
+
+import pytest
+
+from src.core.agent import CodiAgent, ErrorReply
+
+
+class _Delta:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.choices = [types.SimpleNamespace(delta=_Delta(content))]
+
+
+class _Stream:
+    def __init__(self, parts):
+        self.parts = parts
+
+    async def __aiter__(self):
+        for part in self.parts:
+            yield _Chunk(part)
+
+
+class _FailingTaskClient:
+    """Streams a short reply, but every non-streamed (task) completion fails"""
+
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return _Stream(["Sure."])
+        raise RuntimeError("rate limited")
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = CodiAgent()
+    agent.client = _FailingTaskClient()
+    yield agent
+    asyncio.run(agent.aclose())
+
+
+def test_failed_chat_task_is_an_error_reply(agent):
+    async def run():
+        return [chunk async for chunk in agent.chat_stream("please analyze main")]
+
+    chunks = asyncio.run(run())
+    assert chunks[0] == "Sure."
+    assert isinstance(chunks[-1], ErrorReply)
+    assert "rate limited" in chunks[-1]
+    assert isinstance(asyncio.run(agent.chat("please analyze main again")), ErrorReply)
+
+
+def test_failed_chat_task_is_not_cached_by_slack(agent, monkeypatch):
+    from src.integrations import slack_bot
+
+    inserted = []
+
+    async def lookup(text, scope=None):
+        return "embedding", None
+
+    async def insert(embedding, value, scope=None):
+        inserted.append(value)
+
+    monkeypatch.setattr(slack_bot, "app", types.SimpleNamespace(agent=agent))
+    monkeypatch.setattr(slack_bot.semantic_cache, "lookup", lookup)
+    monkeypatch.setattr(slack_bot.semantic_cache, "insert", insert)
+
+    updates = []
+
+    async def say(*args, **kwargs):
+        return {"channel": "C1", "ts": "1.0"}
+
+    async def chat_update(**kwargs):
+        updates.append(kwargs)
+
+    body = {"event": {"user": "U1", "channel": "C1", "text": "<@BOT> please analyze main"}}
+    client = types.SimpleNamespace(chat_update=chat_update)
+    asyncio.run(slack_bot.handle_mention(body, say, client, slack_bot.logger))
+
+    assert updates and "rate limited" in updates[-1]["text"]
+    assert inserted == []
+
+
+def test_parse_code_changes(agent):
+    text = (
+        "File: src/app.py\n"
+        "Here is the fix:\n"
+        "```python\n"
+        "print('hi')\n"
+        "```\n"
+        "```python tests/test_app.py\n"
+        "```\n"
+        "```src/util.py\n"
+        "x = 1\n"
+        "```\n"
+    )
+    assert agent._parse_code_changes(text) == {"src/app.py": "print('hi')", "src/util.py": "x = 1"}
+
+
+def test_parse_code_changes_unclosed_last_fence(agent):
+    text = "```python src/app.py\nx = 1\n```\n```src/util.py\ndef f():\n    return 2\n"
+    assert agent._parse_code_changes(text) == {"src/app.py": "x = 1", "src/util.py": "def f():\n    return 2"}
+
+
+def test_parse_code_changes_crlf(agent):
+    text = "File: src/app.py\r\n```python\r\nx = 1\r\ny = 2\r\n```\r\n"
+    assert agent._parse_code_changes(text) == {"src/app.py": "x = 1\r\ny = 2"}